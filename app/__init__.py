@@ -6,12 +6,15 @@ matching logic, AI inference, and insight generation components.
 """
 
 # Core app components
-from .signal_engine import get_current_signal, simulate_skin_conductance
-from .pattern_mapper import map_traits_to_behavioral_pattern, display_pattern_profile
-from .matcher import match_signal_to_profile
+from .signal_engine import get_current_signal, simulate_skin_conductance, generate_signal_batch
+from .signal_ingest import iter_recording, ingest_recording
+from .signal_record import SignalRecord, EnvironmentalState
+from .pattern_mapper import map_traits_to_behavioral_pattern, display_pattern_profile, get_chrono_profile
+from .matcher import match_signal_to_profile, match_batch
 from .gemma_inference import run_inference, format_prompt
 from .insight_generator import generate_insight
-from .utils import load_json, append_json_line, ensure_dir
+from .inference_pipeline import run_inference_pipeline
+from .utils import load_json, append_json_line, ensure_dir, append_jsonl, load_jsonl, read_last
 from .utils_data import save_signal_data, append_signal_log
 from .utils_format import format_eda_value, format_timestamp
 
@@ -19,21 +22,32 @@ __all__ = [
     # Signal processing
     'get_current_signal',
     'simulate_skin_conductance',
+    'generate_signal_batch',
+    'iter_recording',
+    'ingest_recording',
+    'SignalRecord',
+    'EnvironmentalState',
     
     # Pattern analysis
     'map_traits_to_behavioral_pattern',
     'display_pattern_profile',
+    'get_chrono_profile',
     
     # Matching and inference
     'match_signal_to_profile',
+    'match_batch',
     'run_inference',
     'format_prompt',
     'generate_insight',
+    'run_inference_pipeline',
     
     # Utilities
     'load_json',
     'append_json_line',
     'ensure_dir',
+    'append_jsonl',
+    'load_jsonl',
+    'read_last',
     'save_signal_data',
     'append_signal_log',
     'format_eda_value',
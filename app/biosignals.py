@@ -0,0 +1,239 @@
+"""
+Biosignals — Multi-channel time series with per-channel native rates.
+Each channel is a pair of growable NumPy arrays (int64 epoch-ns timestamps, float32 values),
+so memory grows with the number of samples, not with Python objects per sample. Channels
+are aligned onto a common grid with vectorized forward fill or linear interpolation; every
+aligned channel comes with a validity mask marking grid points that fall in a gap.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.signal_engine import ENVIRONMENTAL_STATES
+from app.signal_record import ns_to_iso
+from app.sqlite_store import to_epoch_us
+
+# Known channels: unit, typical native rate and the default alignment method
+CHANNEL_SPECS = {
+    "skin_conductance": {"unit": "µS", "rate_hz": 4.0, "method": "linear"},
+    "heart_rate": {"unit": "bpm", "rate_hz": 1.0, "method": "linear"},
+    "hrv_rmssd": {"unit": "ms", "rate_hz": 1 / 60, "method": "linear"},
+    "skin_temperature": {"unit": "°C", "rate_hz": 1 / 4, "method": "linear"},
+    "steps": {"unit": "steps/min", "rate_hz": 1 / 60, "method": "ffill"},
+    "sleep_stage": {"unit": "code", "rate_hz": 1 / 30, "method": "ffill"},
+    "state_code": {"unit": "code", "rate_hz": None, "method": "ffill"},
+}
+
+# Default gap tolerance: a grid point further than this from real samples is masked invalid
+DEFAULT_MAX_GAP_FACTOR = 3.0
+
+
+class Channel:
+    """
+    Append-only samples of one channel. Storage doubles when full, so appends are amortised O(1).
+    """
+
+    def __init__(self, name: str, rate_hz: Optional[float] = None, initial_capacity: int = 1024):
+        self.name = name
+        self.rate_hz = rate_hz if rate_hz is not None else CHANNEL_SPECS.get(name, {}).get("rate_hz")
+        self._timestamps = np.empty(initial_capacity, dtype=np.int64)
+        self._values = np.empty(initial_capacity, dtype=np.float32)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def timestamps_ns(self) -> np.ndarray:
+        return self._timestamps[:self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self._size]
+
+    def extend(self, timestamps_ns, values) -> None:
+        """
+        Appends samples. Out-of-order input is merged so timestamps stay sorted.
+        """
+        timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64).ravel()
+        values = np.asarray(values, dtype=np.float32).ravel()
+        if len(timestamps_ns) != len(values):
+            raise ValueError(f"{self.name}: {len(timestamps_ns)} timestamps for {len(values)} values")
+        n = len(values)
+        if n == 0:
+            return
+        needed = self._size + n
+        if needed > len(self._values):
+            capacity = max(needed, 2 * len(self._values))
+            self._timestamps = np.resize(self._timestamps, capacity)
+            self._values = np.resize(self._values, capacity)
+        self._timestamps[self._size:needed] = timestamps_ns
+        self._values[self._size:needed] = values
+        start = max(0, self._size - 1)
+        self._size = needed
+        if np.any(np.diff(self._timestamps[start:needed]) < 0):
+            order = np.argsort(self.timestamps_ns, kind="stable")
+            self._timestamps[:needed] = self.timestamps_ns[order]
+            self._values[:needed] = self.values[order]
+
+    def append(self, timestamp_ns: int, value: float) -> None:
+        self.extend([timestamp_ns], [value])
+
+    def median_interval_ns(self) -> Optional[int]:
+        if self._size < 2:
+            return int(1e9 / self.rate_hz) if self.rate_hz else None
+        return int(np.median(np.diff(self.timestamps_ns)))
+
+    def latest(self) -> Optional[Tuple[int, float]]:
+        if not self._size:
+            return None
+        return int(self._timestamps[self._size - 1]), float(self._values[self._size - 1])
+
+
+def make_grid(start_ns: int, end_ns: int, step_s: float) -> np.ndarray:
+    """
+    Returns grid timestamps start, start + step, ... strictly before end.
+    """
+    step_ns = int(round(step_s * 1e9))
+    if step_ns <= 0:
+        raise ValueError("step_s must be positive")
+    return np.arange(start_ns, end_ns, step_ns, dtype=np.int64)
+
+
+def align_channel(timestamps_ns: np.ndarray, values: np.ndarray, grid_ns: np.ndarray,
+                  method: str = "linear", max_gap_ns: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resamples one series onto a grid.
+    Parameters:
+        timestamps_ns (np.ndarray): Sorted sample times
+        values (np.ndarray): Sample values
+        grid_ns (np.ndarray): Target times
+        method (str): "ffill" (last sample at or before the grid point) or "linear"
+        max_gap_ns (int): Grid points further than this from the supporting samples are invalid
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (float64 values with NaN where invalid, boolean valid mask)
+    """
+    out = np.full(len(grid_ns), np.nan)
+    valid = np.zeros(len(grid_ns), dtype=bool)
+    if len(timestamps_ns) == 0 or len(grid_ns) == 0:
+        return out, valid
+
+    right = np.searchsorted(timestamps_ns, grid_ns, side="right")
+    has_prev = right > 0
+    prev = np.clip(right - 1, 0, len(timestamps_ns) - 1)
+
+    if method == "ffill":
+        valid = has_prev.copy()
+        if max_gap_ns is not None:
+            valid &= (grid_ns - timestamps_ns[prev]) <= max_gap_ns
+        out[valid] = values[prev[valid]]
+    elif method == "linear":
+        has_next = right < len(timestamps_ns)
+        nxt = np.clip(right, 0, len(timestamps_ns) - 1)
+        exact = has_prev & (timestamps_ns[prev] == grid_ns)
+        valid = exact | (has_prev & has_next)
+        if max_gap_ns is not None:
+            valid &= exact | ((timestamps_ns[nxt] - timestamps_ns[prev]) <= max_gap_ns)
+        # Interpolate on offsets from the first sample: absolute epoch-ns values lose precision as float64
+        base = timestamps_ns[0]
+        out[valid] = np.interp(grid_ns[valid] - base, timestamps_ns - base, values.astype(np.float64))
+    else:
+        raise ValueError(f"Unknown alignment method: {method}")
+    return out, valid
+
+
+class MultiChannelSeries:
+    """
+    A set of channels for one user, each at its own native rate.
+    """
+
+    def __init__(self, channels: Optional[Iterable[str]] = None):
+        self.channels: Dict[str, Channel] = {}
+        for name in channels or ():
+            self.channel(name)
+
+    def channel(self, name: str) -> Channel:
+        if name not in self.channels:
+            self.channels[name] = Channel(name)
+        return self.channels[name]
+
+    def extend(self, name: str, timestamps_ns, values) -> None:
+        self.channel(name).extend(timestamps_ns, values)
+
+    def add_signal(self, signal: Dict[str, Any]) -> None:
+        """
+        Adds every known numeric channel present in a signal packet at the packet's timestamp.
+        """
+        ts_us = to_epoch_us(signal.get("timestamp_utc"))
+        if ts_us is None:
+            return
+        for name in CHANNEL_SPECS:
+            value = signal.get(name)
+            if isinstance(value, (int, float)):
+                self.channel(name).append(ts_us * 1000, value)
+        state = signal.get("environmental_state")
+        if state in ENVIRONMENTAL_STATES:
+            self.channel("state_code").append(ts_us * 1000, ENVIRONMENTAL_STATES.index(state))
+
+    def time_span(self) -> Optional[Tuple[int, int]]:
+        spans = [(c.timestamps_ns[0], c.timestamps_ns[-1]) for c in self.channels.values() if len(c)]
+        if not spans:
+            return None
+        return int(min(s for s, _ in spans)), int(max(e for _, e in spans))
+
+    def align(self, step_s: float, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+              methods: Optional[Dict[str, str]] = None, max_gap_s: Optional[Dict[str, float]] = None
+              ) -> Dict[str, np.ndarray]:
+        """
+        Aligns all channels onto one grid.
+        Parameters:
+            step_s (float): Grid spacing in seconds
+            start_ns, end_ns (int): Grid range, defaulting to the span of all channels (end inclusive)
+            methods (Dict[str, str]): Per-channel "ffill"/"linear" overrides of CHANNEL_SPECS
+            max_gap_s (Dict[str, float]): Per-channel gap tolerance; defaults to
+                DEFAULT_MAX_GAP_FACTOR x the larger of the channel's sample interval and step_s
+        Returns:
+            Dict[str, np.ndarray]: "timestamp_ns", then "<channel>" values and "<channel>_valid" masks
+        """
+        span = self.time_span()
+        if span is None:
+            return {"timestamp_ns": np.empty(0, dtype=np.int64)}
+        start_ns = span[0] if start_ns is None else start_ns
+        end_ns = span[1] + 1 if end_ns is None else end_ns
+        grid = make_grid(start_ns, end_ns, step_s)
+
+        aligned: Dict[str, np.ndarray] = {"timestamp_ns": grid}
+        for name, channel in self.channels.items():
+            method = (methods or {}).get(name) or CHANNEL_SPECS.get(name, {}).get("method", "linear")
+            if max_gap_s and name in max_gap_s:
+                gap_ns = int(max_gap_s[name] * 1e9)
+            else:
+                interval = channel.median_interval_ns() or 0
+                gap_ns = int(DEFAULT_MAX_GAP_FACTOR * max(interval, step_s * 1e9))
+            aligned[name], aligned[f"{name}_valid"] = align_channel(
+                channel.timestamps_ns, channel.values, grid, method, gap_ns)
+        return aligned
+
+    def latest_values(self) -> Dict[str, float]:
+        return {name: channel.latest()[1] for name, channel in self.channels.items() if len(channel)}
+
+
+def aligned_to_packets(aligned: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Converts aligned grid rows to signal packets for the matcher; invalid channel values are omitted.
+    """
+    grid = aligned["timestamp_ns"]
+    channels = [name for name in aligned if name != "timestamp_ns" and not name.endswith("_valid")]
+    packets = []
+    for i in range(len(grid)):
+        packet: Dict[str, Any] = {"timestamp_utc": ns_to_iso(int(grid[i]))}
+        for name in channels:
+            if not aligned[f"{name}_valid"][i]:
+                continue
+            if name == "state_code":
+                packet["environmental_state"] = ENVIRONMENTAL_STATES[int(aligned[name][i])]
+            else:
+                packet[name] = round(float(aligned[name][i]), 2)
+        packets.append(packet)
+    return packets
@@ -0,0 +1,78 @@
+"""
+Blob Store — Content-addressed storage for repeated text such as prompt templates and LLM responses.
+Each distinct text is written once under data/blobs/<first two hex chars>/<sha256>.txt and
+referenced from log records by its hash.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from typing import Optional, Set
+
+from app.utils import atomic_write_text
+
+DEFAULT_BLOB_DIR = "data/blobs"
+
+# Hashes already known to be on disk, so repeated puts skip the filesystem entirely
+_known_blobs: Set[str] = set()
+
+
+def blob_hash(text: str) -> str:
+    """
+    Returns the sha256 hex digest used as a blob's address.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def blob_store_dir() -> str:
+    """
+    Returns the configured store root. Read on every call so a BLOB_STORE_DIR loaded from
+    .env after this module was imported still applies.
+    """
+    return os.getenv("BLOB_STORE_DIR", DEFAULT_BLOB_DIR)
+
+
+def blob_path(digest: str, store_dir: Optional[str] = None) -> str:
+    return os.path.join(store_dir or blob_store_dir(), digest[:2], f"{digest}.txt")
+
+
+def put_blob(text: str, store_dir: Optional[str] = None) -> str:
+    """
+    Stores text under its content hash if it isn't stored yet.
+    Parameters:
+        text (str): Content to store
+        store_dir (str): Root directory of the blob store (default: BLOB_STORE_DIR)
+    Returns:
+        str: The blob's sha256 hex digest
+    """
+    store_dir = store_dir or blob_store_dir()
+    digest = blob_hash(text)
+    key = f"{store_dir}:{digest}"
+    if key in _known_blobs:
+        return digest
+
+    path = blob_path(digest, store_dir)
+    if not os.path.exists(path):
+        # Same content always lands at the same path, so concurrent writers can race safely
+        atomic_write_text(text, path)
+
+    _known_blobs.add(key)
+    return digest
+
+
+def get_blob(digest: str, store_dir: Optional[str] = None) -> str:
+    """
+    Loads the text stored under a hash.
+    Raises:
+        KeyError: If no blob with that hash exists
+    """
+    return _read_blob(digest, store_dir or blob_store_dir())
+
+
+@lru_cache(maxsize=256)
+def _read_blob(digest: str, store_dir: str) -> str:
+    try:
+        with open(blob_path(digest, store_dir), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        raise KeyError(f"Blob not found: {digest}") from None
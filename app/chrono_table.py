@@ -0,0 +1,328 @@
+"""
+Chrono Table — Precomputed chrono-signature profiles indexed by day number.
+Both profile engines are pure functions of the birth date, and a century of birth dates is
+only ~40k days, so a build step runs each engine once per day and stores the results as:
+    "<engine>.days.bin"       one uint16/uint32 profile number per day, memory-mapped
+    "<engine>.profiles.json"  table metadata plus every distinct profile, stored once
+Identical profiles (and the strings inside them) are shared, a lookup is a slice-and-int date
+parse, one array read and a copy of the stored profile — no strptime. Dates outside the table,
+non-canonical formats and missing or stale tables fall back to the live engine.
+
+Usage:
+    python -m app.chrono_table                        # build every engine that can be imported
+    python -m app.chrono_table pattern --start 1926-01-01 --end 2035-12-31
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from app.utils import atomic_write_text, ensure_dir, file_lock
+from competition_public.simple_chrono_calc import seasonal_risk_months, simple_chronotype_calculation
+
+DEFAULT_CHRONO_TABLE_DIR = "data/chrono_tables"
+DEFAULT_TABLE_START = date(1926, 1, 1)
+DEFAULT_TABLE_END = date(2035, 12, 31)
+
+# How often a loaded table looks at its files for a rebuild
+TABLE_RELOAD_CHECK_SECONDS = 1.0
+
+
+def _live_pattern_profile(dob: str) -> Dict[str, Any]:
+    from private.core_logic_real import get_chrono_signature_profile
+    return get_chrono_signature_profile(dob)
+
+
+def _pattern_engine_version() -> str:
+    import private.core_logic_real as engine
+    return str(getattr(engine, "ENGINE_VERSION", getattr(engine, "__version__", "1")))
+
+
+def _strip_simple(profile: Dict[str, Any]) -> Dict[str, Any]:
+    # Risk months follow today's month, so they are filled in at lookup time instead
+    timing = profile.get("burnout_timing")
+    if isinstance(timing, dict):
+        timing.pop("high_risk_months", None)
+        timing.pop("recovery_months", None)
+    return profile
+
+
+def _finish_simple(profile: Dict[str, Any]) -> Dict[str, Any]:
+    timing = profile.get("burnout_timing")
+    if isinstance(timing, dict):
+        timing["high_risk_months"], timing["recovery_months"] = seasonal_risk_months()
+    return profile
+
+
+class ChronoEngine:
+    """
+    A profile engine the table can precompute.
+    Parameters:
+        name (str): Table file prefix
+        compute (Callable): Live engine, birth date string -> profile dict
+        version (Callable): Returns the engine version; a table built by another version is ignored
+        day_first (bool): Whether "DD/MM/YYYY" input is equivalent to ISO input for this engine
+        strip / finish (Callable): Remove date-of-lookup dependent fields before storing and
+            restore them after a table read
+    """
+
+    def __init__(self, name: str, compute: Callable[[str], Dict[str, Any]], version: Callable[[], str],
+                 day_first: bool = False, strip: Optional[Callable] = None, finish: Optional[Callable] = None):
+        self.name = name
+        self.compute = compute
+        self.version = version
+        self.day_first = day_first
+        self.strip = strip
+        self.finish = finish
+
+
+ENGINES: Dict[str, ChronoEngine] = {
+    "pattern": ChronoEngine("pattern", _live_pattern_profile, _pattern_engine_version),
+    "simple": ChronoEngine("simple", simple_chronotype_calculation, lambda: "1", day_first=True,
+                           strip=_strip_simple, finish=_finish_simple),
+}
+
+
+def parse_day(dob: str, day_first: bool = False) -> Optional[date]:
+    """
+    Parses a canonical "YYYY-MM-DD" (or, with day_first, "DD/MM/YYYY") date by slicing.
+    Anything else, including valid dates strptime would accept in other spellings, returns None.
+    """
+    if not isinstance(dob, str) or len(dob) != 10:
+        return None
+    try:
+        if dob[4] == "-" and dob[7] == "-":
+            year, month, day = dob[0:4], dob[5:7], dob[8:10]
+        elif day_first and dob[2] == "/" and dob[5] == "/":
+            day, month, year = dob[0:2], dob[3:5], dob[6:10]
+        else:
+            return None
+        if not (year.isdigit() and month.isdigit() and day.isdigit()):
+            return None
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def copy_profile(value: Any) -> Any:
+    # Callers may edit the profile they get back; the stored one must stay intact
+    if isinstance(value, dict):
+        return {key: copy_profile(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_profile(item) for item in value]
+    return value
+
+
+def _intern_profile(value: Any) -> Any:
+    # Strings repeated across stored profiles (tags, rationale lines) become one object each
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(key): _intern_profile(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_intern_profile(item) for item in value]
+    return value
+
+
+def chrono_table_dir() -> str:
+    """
+    Returns the configured table directory. Read on every call so a CHRONO_TABLE_DIR loaded
+    from .env after this module was imported still applies.
+    """
+    return os.getenv("CHRONO_TABLE_DIR", DEFAULT_CHRONO_TABLE_DIR)
+
+
+def table_paths(engine: str, table_dir: Optional[str] = None) -> Tuple[str, str]:
+    base = os.path.join(table_dir or chrono_table_dir(), engine)
+    return f"{base}.days.bin", f"{base}.profiles.json"
+
+
+def build_chrono_table(engine: str, start: date = DEFAULT_TABLE_START, end: date = DEFAULT_TABLE_END,
+                       table_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs an engine for every day in [start, end] and writes its table files.
+    Returns the table metadata.
+    """
+    spec = ENGINES[engine]
+    n_days = (end - start).days + 1
+    if n_days <= 0:
+        raise ValueError("Table end date must not be before its start date")
+
+    profile_numbers: Dict[str, int] = {}
+    profiles: List[Any] = []
+    days = np.empty(n_days, dtype=np.uint32)
+    for offset in range(n_days):
+        profile = spec.compute((start + timedelta(days=offset)).isoformat())
+        if spec.strip is not None:
+            profile = spec.strip(profile)
+        key = json.dumps(profile, sort_keys=True, ensure_ascii=False)
+        number = profile_numbers.get(key)
+        if number is None:
+            number = profile_numbers[key] = len(profiles)
+            profiles.append(profile)
+        days[offset] = number
+
+    dtype = np.uint16 if len(profiles) <= np.iinfo(np.uint16).max + 1 else np.uint32
+    days = days.astype(dtype)
+    meta = {
+        "engine": engine,
+        "version": spec.version(),
+        "start": start.isoformat(),
+        "days": n_days,
+        "dtype": np.dtype(dtype).str,
+        # Ties the two files together: a reader never pairs a day file with another build's profiles
+        "checksum": hashlib.sha256(days.tobytes()).hexdigest()[:16],
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    days_path, profiles_path = table_paths(engine, table_dir)
+    ensure_dir(os.path.dirname(days_path))
+    with file_lock(profiles_path):
+        tmp_path = f"{days_path}.rebuild"
+        days.tofile(tmp_path)
+        os.replace(tmp_path, days_path)
+        atomic_write_text(json.dumps({"meta": meta, "profiles": profiles}, ensure_ascii=False), profiles_path)
+    return dict(meta, profiles=len(profiles))
+
+
+class ChronoTable:
+    """
+    Read-only view of one engine's table. Missing, truncated or version-mismatched tables are
+    treated as empty, so every lookup falls back to the live engine.
+    """
+
+    def __init__(self, engine: str, table_dir: Optional[str] = None):
+        self.engine = ENGINES[engine]
+        self.days_path, self.profiles_path = table_paths(engine, table_dir)
+        # (start ordinal, day -> profile number, profiles), swapped as one object on reload
+        self._table: Optional[Tuple[int, np.ndarray, List[Any]]] = None
+        self._loaded_key = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < TABLE_RELOAD_CHECK_SECONDS:
+            return
+        with self._lock:
+            try:
+                key = (os.stat(self.days_path).st_mtime_ns, os.stat(self.profiles_path).st_mtime_ns)
+            except FileNotFoundError:
+                key = None
+            if key != self._loaded_key:
+                self._load(key)
+            self._checked_at = now
+
+    def _load(self, key) -> None:
+        self._table, self._loaded_key = None, key
+        if key is None:
+            return
+        try:
+            with open(self.profiles_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            meta = stored["meta"]
+            if meta.get("version") != self.engine.version():
+                print(f"⚠️ Chrono table {self.profiles_path} is from engine version {meta.get('version')}; "
+                      f"rebuild it with `python -m app.chrono_table {self.engine.name}`")
+                return
+            dtype = np.dtype(meta["dtype"])
+            if os.path.getsize(self.days_path) != meta["days"] * dtype.itemsize:
+                return
+            days = np.memmap(self.days_path, dtype=dtype, mode="r", shape=(meta["days"],))
+            if hashlib.sha256(days.tobytes()).hexdigest()[:16] != meta.get("checksum"):
+                return
+        except (OSError, ValueError, KeyError, ImportError) as e:
+            print(f"⚠️ Chrono table {self.profiles_path} unavailable: {e}")
+            return
+        profiles = [_intern_profile(profile) for profile in stored["profiles"]]
+        self._table = (date.fromisoformat(meta["start"]).toordinal(), days, profiles)
+
+    def __len__(self) -> int:
+        self._refresh()
+        return 0 if self._table is None else len(self._table[1])
+
+    def get(self, dob: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored profile for a birth date, or None when the table cannot answer.
+        """
+        self._refresh()
+        table = self._table
+        if table is None:
+            return None
+        day = parse_day(dob, self.engine.day_first)
+        if day is None:
+            return None
+        start_ordinal, days, profiles = table
+        offset = day.toordinal() - start_ordinal
+        if offset < 0 or offset >= len(days):
+            return None
+        profile = copy_profile(profiles[days[offset]])
+        return self.engine.finish(profile) if self.engine.finish is not None else profile
+
+    def lookup(self, dob: str) -> Dict[str, Any]:
+        """
+        Returns the profile for a birth date from the table, computing it live when needed.
+        """
+        profile = self.get(dob)
+        return profile if profile is not None else self.engine.compute(dob)
+
+
+_tables: Dict[Tuple[str, str], ChronoTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_chrono_table(engine: str) -> ChronoTable:
+    """
+    Returns the shared table of an engine ("pattern" or "simple").
+    """
+    key = (engine, chrono_table_dir())
+    table = _tables.get(key)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(key)
+            if table is None:
+                table = _tables[key] = ChronoTable(engine, key[1])
+    return table
+
+
+def lookup_simple_profile(birth_date: str) -> Dict[str, Any]:
+    """
+    Table-backed simple_chronotype_calculation().
+    """
+    return get_chrono_table("simple").lookup(birth_date)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute chrono-signature lookup tables.")
+    parser.add_argument("engines", nargs="*", help=f"Engines to build: {', '.join(ENGINES)} (default: all)")
+    parser.add_argument("--start", type=date.fromisoformat, default=DEFAULT_TABLE_START)
+    parser.add_argument("--end", type=date.fromisoformat, default=DEFAULT_TABLE_END)
+    parser.add_argument("--dir", default=None, help="Output directory (default: CHRONO_TABLE_DIR, then data/chrono_tables)")
+    args = parser.parse_args(argv)
+    unknown = [engine for engine in args.engines if engine not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engine(s): {', '.join(unknown)}")
+
+    for engine in args.engines or list(ENGINES):
+        try:
+            started = time.perf_counter()
+            meta = build_chrono_table(engine, args.start, args.end, args.dir)
+        except ImportError as e:
+            print(f"⚠️ Skipping {engine}: engine not available ({e})")
+            continue
+        print(f"✅ {engine}: {meta['days']} days, {meta['profiles']} distinct profiles "
+              f"({time.perf_counter() - started:.1f}s) → {table_paths(engine, args.dir)[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
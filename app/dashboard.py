@@ -1,19 +1,25 @@
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 import json
-from datetime import datetime
+import os
 
 from app.signal_engine import get_current_signal
 from app.pattern_mapper import map_traits_to_behavioral_pattern
-from app.matcher import match_signal_to_profile
-from app.gemma_inference import run_inference
-from app.insight_generator import generate_insight
-from app.utils import load_json, append_json_line, ensure_dir
+from app.gemma_inference import expand_inference_record
+from app.inference_pipeline import run_inference_pipeline
+from app.utils import load_json, ensure_dir
+from app.utils_data import append_signal_log
+from app.sqlite_store import get_store, is_sqlite_path
+from app.log_rotation import read_last_records
+from app.log_writer import flush_logs
+from app.signal_buffer import get_signal_buffer
+from app.signal_stats import get_signal_stats
+from app.profile_cache import get_profile_cache
 
 # --- Config
 USER_PROFILE_PATH = "data/user_profile.json"
-INFERENCE_LOG_PATH = "data/inference_log.json"
-SIGNAL_LOG_PATH = "data/signal_log.json"
+INFERENCE_LOG_PATH = os.getenv("INFERENCE_LOG_PATH", "data/inference_log.jsonl")
+SIGNAL_LOG_PATH = os.getenv("SIGNAL_LOG_PATH", "data/signal_log.jsonl")
 
 st.set_page_config(page_title="GemmaGuard Dashboard", layout="centered")
 
@@ -43,38 +49,48 @@ with st.sidebar:
 
     st.subheader("📎 Pattern Tags")
     st.write(pattern_tags)
+    cache_stats = get_profile_cache().stats()
+    st.caption(f"Profile cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 
 # --- Signal Capture
+signal_buffer = get_signal_buffer(user_profile.get("name", "User"))
+signal_stats = get_signal_stats(user_profile.get("name", "User"))
 st.session_state.latest_signal = get_current_signal()
+signal_buffer.append_signal(st.session_state.latest_signal)
+signal_stats.update_signal(st.session_state.latest_signal)
 
 # --- Display Signal
 st.subheader("📡 Live Signal Snapshot")
 st.json(st.session_state.latest_signal)
 
+recent = signal_buffer.window(60)
+if len(recent) > 1:
+    st.caption(f"Last {len(recent)} readings (µS)")
+    st.line_chart(recent["skin_conductance"])
+
+rolling = signal_stats.snapshot()
+for column, (window, stats) in zip(st.columns(len(rolling)), rolling.items()):
+    if stats["count"]:
+        column.metric(f"EWMA {window}", f"{stats['ewma']:.2f} µS", help=f"mean {stats['mean']:.2f}, "
+                      f"range {stats['min']:.2f}–{stats['max']:.2f}, p90 {stats['p90']:.2f}")
+
 # --- Run Inference Button
 if st.button("🧠 Run Inference"):
     ensure_dir("data")
-    append_json_line(st.session_state.latest_signal, SIGNAL_LOG_PATH)
+    append_signal_log(st.session_state.latest_signal, SIGNAL_LOG_PATH)
 
     with st.spinner("🧠 Gemma is analyzing the signal..."):
         progress_bar = st.progress(0)
         progress_bar.progress(10)
 
-        match_result = match_signal_to_profile(st.session_state.latest_signal, pattern_tags)
-        progress_bar.progress(40)
-
-        inference = run_inference(pattern_tags, st.session_state.latest_signal)
-        progress_bar.progress(70)
-
-        insight = generate_insight(match_result, inference["inference"])
-        progress_bar.progress(90)
-
-        append_json_line({
-            "timestamp": datetime.utcnow().isoformat(),
-            "summary": insight["summary"],
-            "recommendation": insight["recommendation"]
-        }, INFERENCE_LOG_PATH)
-        progress_bar.progress(100)
+        outcome = run_inference_pipeline(
+            st.session_state.latest_signal,
+            pattern_tags,
+            save_to=INFERENCE_LOG_PATH,
+            on_progress=progress_bar.progress
+        )
+        inference = outcome["inference"]
+        insight = outcome["insight"]
 
     st.success("✅ Inference Complete")
     st.markdown(f"**🧾 Summary:** {insight['summary']}")
@@ -88,12 +104,17 @@ if st.button("🧠 Run Inference"):
 st.divider()
 st.subheader("📜 Inference History")
 
-inference_log = load_json(INFERENCE_LOG_PATH, default=[])
+# Records from this run may still be queued on the background writer
+flush_logs()
+if is_sqlite_path(INFERENCE_LOG_PATH):
+    inference_log = get_store(INFERENCE_LOG_PATH).latest_inferences(5)
+else:
+    inference_log = read_last_records(INFERENCE_LOG_PATH, 5)
 if not inference_log:
     st.info("No previous inference yet.")
 else:
-    latest_logs = inference_log[-5:][::-1]
-    for entry in latest_logs:
-        with st.expander(f"🕒 {entry['timestamp']}"):
-            st.write(f"**Summary:** {entry['summary']}")
-            st.write(f"**Gemma Says:** {entry['recommendation']}")
\ No newline at end of file
+    latest_logs = inference_log[::-1]
+    for entry in map(expand_inference_record, latest_logs):
+        with st.expander(f"🕒 {entry.get('timestamp', 'unknown time')}"):
+            st.write(f"**Summary:** {entry.get('summary', 'N/A')}")
+            st.write(f"**Gemma Says:** {entry.get('recommendation') or entry.get('inference', 'N/A')}")
\ No newline at end of file
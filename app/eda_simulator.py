@@ -0,0 +1,168 @@
+# 🌊 Gemma Guard — Continuous EDA Stream Simulator
+# Produces time-continuous skin conductance at device sampling rates (4–32 Hz) in fixed-size chunks.
+# Model: tonic level (mean-reverting drift + circadian swing) + phasic SCR peaks + sensor noise.
+
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from app.signal_engine import ENVIRONMENTAL_STATES, SIGNAL_SAMPLE_DTYPE, spawn_signal_rng
+
+# How much more often SCRs fire under each environmental state
+STATE_SCR_MULTIPLIER = {"expansive": 1.1, "restrictive": 1.4, "neutral": 1.0, "charged": 1.8}
+
+
+class EDAProfile:
+    """
+    Per-user physiological parameters for the EDA stream model.
+
+    Parameters:
+        tonic_level (float): Baseline skin conductance level in µS
+        tonic_variability (float): Stationary standard deviation of the slow tonic drift (µS)
+        tonic_timescale_s (float): Mean-reversion time constant of the tonic drift (seconds)
+        circadian_amplitude (float): Peak deviation of the daily rhythm (µS)
+        circadian_peak_hour (float): UTC hour at which the daily rhythm peaks
+        scr_rate_per_min (float): Baseline frequency of spontaneous SCR peaks
+        scr_amplitude (float): Mean SCR peak amplitude (µS); amplitudes are exponentially distributed
+        scr_rise_s (float): SCR rise time constant (seconds)
+        scr_decay_s (float): SCR recovery time constant (seconds)
+        noise_sd (float): Sensor noise standard deviation (µS)
+        state_changes_per_hour (float): Average rate of environmental state transitions
+    """
+
+    def __init__(self, tonic_level: float = 2.5, tonic_variability: float = 0.4, tonic_timescale_s: float = 900.0,
+                 circadian_amplitude: float = 0.5, circadian_peak_hour: float = 15.0,
+                 scr_rate_per_min: float = 3.0, scr_amplitude: float = 0.35,
+                 scr_rise_s: float = 0.75, scr_decay_s: float = 4.0,
+                 noise_sd: float = 0.02, state_changes_per_hour: float = 2.0):
+        self.tonic_level = tonic_level
+        self.tonic_variability = tonic_variability
+        self.tonic_timescale_s = tonic_timescale_s
+        self.circadian_amplitude = circadian_amplitude
+        self.circadian_peak_hour = circadian_peak_hour
+        self.scr_rate_per_min = scr_rate_per_min
+        self.scr_amplitude = scr_amplitude
+        self.scr_rise_s = scr_rise_s
+        self.scr_decay_s = scr_decay_s
+        self.noise_sd = noise_sd
+        self.state_changes_per_hour = state_changes_per_hour
+
+
+class EDAStreamSimulator:
+    """
+    Stateful generator of consecutive EDA chunks for one user.
+    Chunks join seamlessly: the tonic drift, the environmental state and the tails of
+    SCRs that started near the end of a chunk all carry over into the next one.
+    """
+
+    def __init__(self, profile: Optional[EDAProfile] = None, rate_hz: float = 4.0, chunk_size: int = 1024,
+                 start: Optional[datetime] = None, rng: Optional[np.random.Generator] = None):
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        self.profile = profile or EDAProfile()
+        self.rate_hz = rate_hz
+        self.chunk_size = chunk_size
+        self.rng = rng if rng is not None else spawn_signal_rng()
+
+        start = start or datetime.now(timezone.utc)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        self._start_ns = int(start.timestamp()) * 1_000_000_000 + start.microsecond * 1_000
+        self._sample_index = 0
+
+        p = self.profile
+        dt = 1.0 / rate_hz
+        self._phi = np.exp(-dt / p.tonic_timescale_s)
+        self._drift_sd = p.tonic_variability * np.sqrt(1.0 - self._phi ** 2)
+        self._drift = self.rng.normal(0.0, p.tonic_variability)
+        self._state = int(self.rng.integers(len(ENVIRONMENTAL_STATES)))
+        self._state_multiplier = np.array([STATE_SCR_MULTIPLIER[s] for s in ENVIRONMENTAL_STATES])
+
+        # Bi-exponential SCR impulse response, normalised to a peak of 1
+        t = np.arange(int(np.ceil(6 * p.scr_decay_s * rate_hz)) + 1) * dt
+        kernel = np.exp(-t / p.scr_decay_s) - np.exp(-t / p.scr_rise_s)
+        self._kernel = kernel / kernel.max()
+        self._phasic_tail = np.zeros(len(self._kernel) - 1)
+
+    def _tonic_drift(self, n: int) -> np.ndarray:
+        # Exact Ornstein-Uhlenbeck recursion x[k] = phi * x[k-1] + e[k], evaluated in closed form.
+        # Blocks are capped so phi ** -k stays well inside float range.
+        block = max(1, int(50 * self.profile.tonic_timescale_s * self.rate_hz))
+        parts = []
+        for offset in range(0, n, block):
+            m = min(block, n - offset)
+            k = np.arange(1, m + 1)
+            shocks = self.rng.normal(0.0, self._drift_sd, m)
+            drift = self._phi ** k * (self._drift + np.cumsum(shocks * self._phi ** -k))
+            self._drift = drift[-1]
+            parts.append(drift)
+        return np.concatenate(parts)
+
+    def _states(self, n: int) -> np.ndarray:
+        p_switch = self.profile.state_changes_per_hour / 3600.0 / self.rate_hz
+        switches = np.flatnonzero(self.rng.random(n) < p_switch)
+        states = np.full(n, self._state, dtype=np.uint8)
+        for position in switches:
+            self._state = int(self.rng.integers(len(ENVIRONMENTAL_STATES)))
+            states[position:] = self._state
+        return states
+
+    def _phasic(self, states: np.ndarray) -> np.ndarray:
+        n = len(states)
+        p = self.profile
+        p_scr = p.scr_rate_per_min / 60.0 / self.rate_hz * self._state_multiplier[states]
+        impulses = np.where(self.rng.random(n) < p_scr, self.rng.exponential(p.scr_amplitude, n), 0.0)
+
+        # Overlap-add: SCRs from earlier chunks keep decaying into this one
+        response = np.convolve(impulses, self._kernel)
+        response[:len(self._phasic_tail)] += self._phasic_tail
+        self._phasic_tail = response[n:].copy()
+        return response[:n]
+
+    def next_chunk(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the next n samples (default chunk_size) as a SIGNAL_SAMPLE_DTYPE array.
+        """
+        n = n or self.chunk_size
+        p = self.profile
+        offsets = self._sample_index + np.arange(n)
+        timestamps = self._start_ns + np.round(offsets * (1e9 / self.rate_hz)).astype(np.int64)
+        self._sample_index += n
+
+        hours = (timestamps // 1_000_000_000 % 86_400) / 3600.0
+        circadian = p.circadian_amplitude * np.cos(2 * np.pi * (hours - p.circadian_peak_hour) / 24.0)
+        states = self._states(n)
+        eda = (p.tonic_level + self._tonic_drift(n) + circadian + self._phasic(states)
+               + self.rng.normal(0.0, p.noise_sd, n))
+
+        chunk = np.empty(n, dtype=SIGNAL_SAMPLE_DTYPE)
+        chunk["timestamp_ns"] = timestamps
+        chunk["skin_conductance"] = np.maximum(eda, 0.05)
+        chunk["state_code"] = states
+        return chunk
+
+    def chunks(self, count: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Yields consecutive chunks, indefinitely when count is None.
+        """
+        produced = 0
+        while count is None or produced < count:
+            yield self.next_chunk()
+            produced += 1
+
+
+def simulate_users(profiles: Dict[str, EDAProfile], rate_hz: float = 4.0, chunk_size: int = 1024,
+                   start: Optional[datetime] = None, rng: Optional[np.random.Generator] = None
+                   ) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Streams many users in lockstep: each step yields {user_id: chunk} covering the same time span.
+    """
+    rng = rng if rng is not None else spawn_signal_rng()
+    start = start or datetime.now(timezone.utc)
+    simulators = {
+        user_id: EDAStreamSimulator(profile, rate_hz, chunk_size, start, rng=np.random.default_rng(rng.integers(2**63)))
+        for user_id, profile in profiles.items()
+    }
+    while True:
+        yield {user_id: sim.next_chunk() for user_id, sim in simulators.items()}
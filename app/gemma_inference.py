@@ -3,13 +3,17 @@ Inference Engine: Combines behavioral pattern tags and biosignal data to generat
 Built for compatibility with Gemma 3n via Ollama. Logging enabled for longitudinal analysis.
 """
 
-import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
+from app.log_writer import INFERENCE_TABLE, submit_record
+from app.blob_store import get_blob, put_blob
+from app.signal_record import as_signal_dict
+from app.tag_registry import get_tag_registry, has_all, has_any
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -23,38 +27,55 @@ Path("data").mkdir(exist_ok=True)
 Path("prompts").mkdir(exist_ok=True)
 
 
-def format_prompt(pattern_tags: List[str], signal_data: Dict[str, Any], template_path: str = "prompts/base_prompt.txt") -> str:
+PROMPT_TEMPLATE_PATH = "prompts/base_prompt.txt"
+
+
+def load_prompt_template(template_path: str = PROMPT_TEMPLATE_PATH) -> str:
     """
-    Formats a structured prompt by embedding behavioral and biosignal tags into the base template.
+    Reads the raw prompt template text.
     Parameters:
-        pattern_tags (List[str]): Tags from pattern_mapper.py
-        signal_data (Dict[str, Any]): Live or simulated biosignal input
         template_path (str): Path to prompt template
     Returns:
-        str: Finalized prompt for LLM
+        str: Template with {pattern_tags}, {skin_conductance} and {environmental_state} placeholders
     """
     if not Path(template_path).exists():
         raise FileNotFoundError(f"Prompt template not found: {template_path}")
 
     with open(template_path, "r") as f:
-        base_prompt = f.read()
+        return f.read()
+
 
-    prompt = base_prompt.format(
+def render_prompt(base_prompt: str, pattern_tags: List[str], signal_data: Dict[str, Any]) -> str:
+    """
+    Substitutes behavioral tags and biosignal readings into a prompt template.
+    """
+    return base_prompt.format(
         pattern_tags=", ".join(pattern_tags),
         skin_conductance=signal_data.get("skin_conductance", "N/A"),
         environmental_state=signal_data.get("environmental_state", "neutral")  # Updated from cosmic_state
     )
 
-    return prompt
 
+def format_prompt(pattern_tags: List[str], signal_data: Dict[str, Any], template_path: str = PROMPT_TEMPLATE_PATH) -> str:
+    """
+    Formats a structured prompt by embedding behavioral and biosignal tags into the base template.
+    Parameters:
+        pattern_tags (List[str]): Tags from pattern_mapper.py
+        signal_data (Dict[str, Any]): Live or simulated biosignal input
+        template_path (str): Path to prompt template
+    Returns:
+        str: Finalized prompt for LLM
+    """
+    return render_prompt(load_prompt_template(template_path), pattern_tags, signal_data)
 
-def run_inference(pattern_tags: List[str], signal_data: Dict[str, Any], save_to: str = "data/inference_log.json") -> Dict[str, Any]:
+
+def run_inference(pattern_tags: List[str], signal_data: Dict[str, Any], save_to: Optional[str] = "data/inference_log.jsonl") -> Dict[str, Any]:
     """
     Executes prompt construction, sends to Gemma via Ollama, and logs advisory inference.
     Parameters:
         pattern_tags (List[str]): Behavior-linked tags
         signal_data (Dict[str, Any]): Biosignal readings
-        save_to (str): Path to JSON log
+        save_to (str): Path to inference log (see log_inference for supported backends), or None to skip logging
     Returns:
         Dict[str, Any]: Inference package including prompt and timestamp
     """
@@ -62,7 +83,8 @@ def run_inference(pattern_tags: List[str], signal_data: Dict[str, Any], save_to:
     enable_ollama = os.getenv("ENABLE_OLLAMA_INTEGRATION", "false").lower() == "true"
     model = os.getenv("OLLAMA_MODEL", "gemma2:7b")
     
-    prompt = format_prompt(pattern_tags, signal_data)
+    template = load_prompt_template()
+    prompt = render_prompt(template, pattern_tags, signal_data)
 
     if enable_ollama:
         # Use real Gemma via Ollama
@@ -72,48 +94,108 @@ def run_inference(pattern_tags: List[str], signal_data: Dict[str, Any], save_to:
         # Check Ollama health status
         health_status = check_ollama_health()
         if health_status["status"] != "healthy":
-            response = f"🔧 Ollama Status: {health_status.get('error', 'Unknown error')}\n\nFallback: {simulate_gemma_response(prompt)}"
+            response = f"🔧 Ollama Status: {health_status.get('error', 'Unknown error')}\n\nFallback: {simulate_gemma_response(prompt, pattern_tags)}"
             llm_model = "Gemma-Fallback"
     else:
         # Use simulation for development
-        response = simulate_gemma_response(prompt)
+        response = simulate_gemma_response(prompt, pattern_tags)
         llm_model = "Gemma-Simulated"
 
     result = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "pattern_tags": pattern_tags,
-        "signal_data": signal_data,
+        "signal_data": as_signal_dict(signal_data),
         "prompt_used": prompt,
         "inference": response,
         "llm_model": llm_model
     }
 
-    # Append inference result to log file
-    try:
-        with open(save_to, "r", encoding='utf-8') as f:
-            history = json.load(f)
-    except FileNotFoundError:
-        history = []
+    # Append inference result to log file, storing prompt and response text by hash
+    if save_to:
+        log_inference(compact_inference_record(result, template), save_to)
 
-    history.append(result)
+    return result
 
-    with open(save_to, "w", encoding='utf-8') as f:
-        json.dump(history, f, indent=4, ensure_ascii=False)
 
-    return result
+def log_inference(record: Dict[str, Any], save_to: str) -> None:
+    """
+    Persists one inference record to the log backend selected by the path.
+    The write is handed to the background log writer unless LOG_WRITER_BACKGROUND is disabled.
+    Parameters:
+        record (Dict[str, Any]): Inference record to store
+        save_to (str): ".db"/".sqlite" for the SQLite store, ".jsonl" for JSON Lines,
+            anything else for a legacy JSON array file
+    """
+    submit_record(record, save_to, INFERENCE_TABLE)
+
+
+def compact_inference_record(result: Dict[str, Any], template: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Replaces the full prompt and response text of an inference result with blob-store hashes.
+    The prompt is rebuilt on read from the template hash plus pattern_tags and signal_data.
+    Parameters:
+        result (Dict[str, Any]): Output of run_inference
+        template (str): Prompt template the result's prompt was rendered from, defaults to the base template
+    Returns:
+        Dict[str, Any]: Log record without prompt_used / inference text
+    """
+    if template is None:
+        template = load_prompt_template()
+    record = {k: v for k, v in result.items() if k not in ("prompt_used", "inference")}
+    record["prompt_template_hash"] = put_blob(template)
+    record["inference_hash"] = put_blob(result.get("inference", ""))
+    return record
 
 
-def simulate_gemma_response(prompt: str) -> str:
+def expand_inference_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Restores prompt_used and inference text on a compacted log record.
+    Records written before compaction, or whose blobs are missing, are returned unchanged.
+    """
+    if "prompt_template_hash" not in record and "inference_hash" not in record:
+        return record
+
+    expanded = dict(record)
+    try:
+        if "prompt_template_hash" in record:
+            template = get_blob(record["prompt_template_hash"])
+            expanded["prompt_used"] = render_prompt(template, record.get("pattern_tags", []), record.get("signal_data", {}))
+        if "inference_hash" in record:
+            expanded["inference"] = get_blob(record["inference_hash"])
+            # Unified pipeline records carry the insight recommendation as the inference text
+            if "summary" in record:
+                expanded.setdefault("recommendation", expanded["inference"])
+    except KeyError:
+        return record
+    return expanded
+
+
+_VOLATILE_REACTIVE_MASK = get_tag_registry().mask(["reactive", "volatile"])
+_CREATIVE_MASK = get_tag_registry().mask(["creative"])
+_EXPANSION_MASK = get_tag_registry().mask(["stimulus-seeking", "early-peak"])
+
+
+def simulate_gemma_response(prompt: str, pattern_tags: Optional[List[str]] = None) -> str:
     """
     Fallback simulator for development and when Ollama is unavailable.
+    With pattern_tags the response is chosen by exact tag bitmask tests; without them it
+    falls back to searching the prompt text.
     """
-    if "reactive" in prompt and "volatile" in prompt:
+    if pattern_tags is not None:
+        tag_mask = get_tag_registry().mask(pattern_tags)
+        volatile_reactive = has_all(tag_mask, _VOLATILE_REACTIVE_MASK)
+        creative_expansion = has_all(tag_mask, _CREATIVE_MASK) and has_any(tag_mask, _EXPANSION_MASK)
+    else:
+        volatile_reactive = "reactive" in prompt and "volatile" in prompt
+        creative_expansion = "creative" in prompt and ("stimulus-seeking" in prompt or "early-peak" in prompt)
+
+    if volatile_reactive:
         return (
             "🔬 Burnout Risk Insight: Elevated stress markers detected in behavioral patterns.\n"
             "🧘 Regulation Strategy: Prioritize low-stimulation tasks and reflective journaling. "
             "Avoid high-emotion meetings or conflict-heavy spaces today."
         )
-    elif "creative" in prompt and ("stimulus-seeking" in prompt or "early-peak" in prompt):
+    elif creative_expansion:
         return (
             "🔬 Burnout Risk Insight: Cognitive expansion phase detected - monitor for overstimulation.\n"
             "🧘 Regulation Strategy: Leverage ideation timeframes for focused creative work. "
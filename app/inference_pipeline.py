@@ -0,0 +1,85 @@
+# 🔁 Gemma Guard — Inference Pipeline
+# Runs match → inference → insight for one signal and persists a single unified log record
+
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from app.matcher import match_signal_to_profile
+from app.gemma_inference import run_inference, log_inference, compact_inference_record
+from app.insight_generator import generate_insight
+from app.signal_record import as_signal_dict
+
+INFERENCE_RECORD_SCHEMA = "2.0"
+
+
+def build_inference_record(signal: Dict[str, Any], pattern_tags: List[str], match_result: Dict[str, Any],
+                           inference_result: Dict[str, Any], insight: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Assembles the unified inference log record.
+
+    Parameters:
+        signal (dict): Signal packet the inference was run on
+        pattern_tags (list): Behavioral pattern tags used for matching and prompting
+        match_result (dict): Output of matcher.match_signal_to_profile()
+        inference_result (dict): Output of gemma_inference.run_inference()
+        insight (dict): Output of insight_generator.generate_insight()
+
+    Returns:
+        dict: Log record with prompt and response text replaced by blob hashes.
+            The recommendation is the inference text, restored by expand_inference_record().
+    """
+    record = {
+        "schema_version": INFERENCE_RECORD_SCHEMA,
+        "record_id": str(uuid.uuid4()),
+        "timestamp": inference_result["timestamp"],
+        "signal_id": signal.get("signal_id"),
+        "pattern_tags": pattern_tags,
+        "signal_data": as_signal_dict(signal),
+        "match_result": match_result,
+        "summary": insight["summary"],
+        "prompt_used": inference_result["prompt_used"],
+        "inference": inference_result["inference"],
+        "llm_model": inference_result["llm_model"],
+    }
+    return compact_inference_record(record)
+
+
+def run_inference_pipeline(signal: Dict[str, Any], pattern_tags: List[str], save_to: Optional[str],
+                           on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+    """
+    Matches a signal against pattern tags, runs Gemma inference, builds the insight,
+    and writes exactly one record to the inference log.
+
+    Parameters:
+        signal (dict): Signal packet from signal_engine.get_current_signal()
+        pattern_tags (list): Trait-based pattern tags from pattern_mapper.py
+        save_to (str): Inference log path, or None to skip logging
+        on_progress (callable): Optional callback receiving a 0–100 completion percentage
+
+    Returns:
+        dict: match_result, inference (full run_inference output), insight and the logged record
+    """
+    def progress(percent: int) -> None:
+        if on_progress is not None:
+            on_progress(percent)
+
+    match_result = match_signal_to_profile(signal, pattern_tags)
+    progress(30)
+
+    inference_result = run_inference(pattern_tags, signal, save_to=None)
+    progress(70)
+
+    insight = generate_insight(match_result, inference_result["inference"])
+    progress(85)
+
+    record = build_inference_record(signal, pattern_tags, match_result, inference_result, insight)
+    if save_to:
+        log_inference(record, save_to)
+    progress(100)
+
+    return {
+        "match_result": match_result,
+        "inference": inference_result,
+        "insight": insight,
+        "record": record,
+    }
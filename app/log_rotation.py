@@ -0,0 +1,337 @@
+"""
+Log Rotation — Size/age-based segmentation, compression and retention for JSONL logs.
+The active log (e.g. data/inference_log.jsonl) is closed into a compressed segment under
+data/inference_log.segments/ once it grows past the configured limits. A manifest records
+each segment's time range so range reads only open the segments they overlap.
+
+Configuration (environment):
+    LOG_ROTATE_MAX_BYTES        Close the active log once it reaches this size (default 4 MiB, 0 disables)
+    LOG_ROTATE_MAX_AGE_HOURS    Close the active log once its oldest record is this old (default 0, disabled)
+    LOG_SEGMENT_COMPRESSION     "gzip" (default) or "zstd" (requires the zstandard package)
+    LOG_RETENTION_MAX_BYTES     Delete oldest segments beyond this total size (default 256 MiB, 0 disables)
+    LOG_RETENTION_MAX_AGE_DAYS  Delete segments whose newest record is older than this (default 0, disabled)
+"""
+
+import gzip
+import io
+import json
+import os
+import shutil
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.utils import ensure_dir, file_lock, is_jsonl_path, iter_jsonl, iter_jsonl_reverse, load_json, read_last, save_json
+from app.sqlite_store import TimeBound, to_epoch_us
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency; gzip is always available
+    zstandard = None
+
+RECORD_TIME_KEYS = ("timestamp_utc", "timestamp", "logged_at_utc")
+
+
+class RotationPolicy:
+    """
+    Segment and retention limits for one log. A limit of 0 disables that rule.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, max_age_hours: float = 0,
+                 compression: str = "gzip", retention_max_bytes: int = 256 * 1024 * 1024,
+                 retention_max_age_days: float = 0):
+        if compression not in ("gzip", "zstd"):
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires the 'zstandard' package")
+        self.max_bytes = max_bytes
+        self.max_age_hours = max_age_hours
+        self.compression = compression
+        self.retention_max_bytes = retention_max_bytes
+        self.retention_max_age_days = retention_max_age_days
+
+    @classmethod
+    def from_env(cls) -> "RotationPolicy":
+        return cls(
+            max_bytes=int(os.getenv("LOG_ROTATE_MAX_BYTES", str(4 * 1024 * 1024))),
+            max_age_hours=float(os.getenv("LOG_ROTATE_MAX_AGE_HOURS", "0")),
+            compression=os.getenv("LOG_SEGMENT_COMPRESSION", "gzip").lower(),
+            retention_max_bytes=int(os.getenv("LOG_RETENTION_MAX_BYTES", str(256 * 1024 * 1024))),
+            retention_max_age_days=float(os.getenv("LOG_RETENTION_MAX_AGE_DAYS", "0")),
+        )
+
+
+def record_time_us(record: Dict[str, Any]) -> Optional[int]:
+    """
+    Returns a log record's timestamp in epoch microseconds, or None if it has none.
+    """
+    for key in RECORD_TIME_KEYS:
+        value = record.get(key)
+        if value:
+            parsed = to_epoch_us(value)
+            if parsed is not None:
+                return parsed
+    return None
+
+
+def segment_dir(filepath: str) -> str:
+    return str(Path(filepath).with_suffix(".segments"))
+
+
+def manifest_path(filepath: str) -> str:
+    return os.path.join(segment_dir(filepath), "manifest.json")
+
+
+def load_manifest(filepath: str) -> List[Dict[str, Any]]:
+    """
+    Returns the closed segments of a log, oldest first.
+    Each entry has file, start_us, end_us, records and bytes.
+    """
+    manifest = load_json(manifest_path(filepath), default={"segments": []})
+    return manifest.get("segments", []) if isinstance(manifest, dict) else []
+
+
+def _last_sequence(filepath: str, segments: List[Dict[str, Any]]) -> int:
+    # High-water mark: survives retention deleting every segment, so names are never reused
+    manifest = load_json(manifest_path(filepath), default={})
+    last = manifest.get("last_sequence", 0) if isinstance(manifest, dict) else 0
+    return max([last] + [segment["sequence"] for segment in segments])
+
+
+def _save_manifest(filepath: str, segments: List[Dict[str, Any]], last_sequence: int) -> None:
+    save_json({"log": os.path.basename(filepath), "last_sequence": last_sequence, "segments": segments},
+              manifest_path(filepath))
+
+
+def _open_segment(path: str):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(f"Reading {path} requires the 'zstandard' package")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def iter_segment(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the records of one compressed segment file.
+    """
+    with _open_segment(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _active_age_hours(filepath: str) -> float:
+    first = next(iter_jsonl(filepath), None)
+    started = record_time_us(first) if first else None
+    if started is None:
+        return 0.0
+    return (time.time() * 1_000_000 - started) / 3_600_000_000
+
+
+def should_rotate(filepath: str, policy: RotationPolicy) -> bool:
+    """
+    Checks whether the active log has outgrown the policy's size or age limit.
+    """
+    if not os.path.exists(filepath):
+        return False
+    size = os.path.getsize(filepath)
+    if size == 0:
+        return False
+    if policy.max_bytes and size >= policy.max_bytes:
+        return True
+    if policy.max_age_hours and _active_age_hours(filepath) >= policy.max_age_hours:
+        return True
+    return False
+
+
+def rotate_log(filepath: str, policy: Optional[RotationPolicy] = None) -> Optional[Dict[str, Any]]:
+    """
+    Closes the active log into a compressed segment, records it in the manifest
+    and applies retention. Returns the new manifest entry, or None if the log was empty.
+    Holds the log's file lock throughout, so appenders in other processes wait rather
+    than writing into a file that is being closed.
+    """
+    policy = policy or RotationPolicy.from_env()
+    with file_lock(filepath):
+        return _rotate_locked(filepath, policy)
+
+
+def _rotate_locked(filepath: str, policy: RotationPolicy) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+        return None
+
+    segments = load_manifest(filepath)
+    directory = segment_dir(filepath)
+    ensure_dir(directory)
+    sequence = _last_sequence(filepath, segments) + 1
+    extension = ".jsonl.zst" if policy.compression == "zstd" else ".jsonl.gz"
+    segment_name = f"{sequence:06d}{extension}"
+
+    # Move the active file aside first so the next append starts a fresh log
+    closing_path = os.path.join(directory, f"{sequence:06d}.jsonl")
+    os.replace(filepath, closing_path)
+
+    start_us, end_us, count = None, None, 0
+    for record in iter_jsonl(closing_path):
+        count += 1
+        ts = record_time_us(record)
+        if ts is None:
+            continue
+        start_us = ts if start_us is None else min(start_us, ts)
+        end_us = ts if end_us is None else max(end_us, ts)
+
+    segment_path = os.path.join(directory, segment_name)
+    with open(closing_path, "rb") as src:
+        if policy.compression == "zstd":
+            with open(segment_path, "wb") as dst:
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+        else:
+            with gzip.open(segment_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+    os.remove(closing_path)
+
+    entry = {
+        "sequence": sequence,
+        "file": segment_name,
+        "start_us": start_us,
+        "end_us": end_us,
+        "records": count,
+        "bytes": os.path.getsize(segment_path),
+        "closed_at_utc": datetime.now(timezone.utc).isoformat(),
+    }
+    segments.append(entry)
+    segments = apply_retention(filepath, segments, policy)
+    _save_manifest(filepath, segments, sequence)
+    return entry
+
+
+def apply_retention(filepath: str, segments: List[Dict[str, Any]], policy: RotationPolicy) -> List[Dict[str, Any]]:
+    """
+    Deletes the oldest segments that exceed the retention limits and returns the survivors.
+    """
+    directory = segment_dir(filepath)
+    kept = list(segments)
+    dropped: List[Dict[str, Any]] = []
+
+    if policy.retention_max_age_days:
+        cutoff = time.time() * 1_000_000 - policy.retention_max_age_days * 86_400_000_000
+        while kept and kept[0].get("end_us") is not None and kept[0]["end_us"] < cutoff:
+            dropped.append(kept.pop(0))
+            _remove_segment(directory, dropped[-1])
+
+    if policy.retention_max_bytes:
+        total = sum(s.get("bytes", 0) for s in kept)
+        while kept and total > policy.retention_max_bytes:
+            dropped.append(kept.pop(0))
+            total -= dropped[-1].get("bytes", 0)
+            _remove_segment(directory, dropped[-1])
+
+    if dropped:
+        _prune_derived(filepath, dropped, kept)
+    return kept
+
+
+def _prune_derived(filepath: str, dropped: List[Dict[str, Any]], kept: List[Dict[str, Any]]) -> None:
+    """
+    Trims the signal index sidecar and minute rollups to the data that is still in the log:
+    everything before the newest deleted record, but never past the oldest kept one.
+    Hour and day rollups outlive the raw log under their own retention settings.
+    """
+    ends = [s["end_us"] for s in dropped if s.get("end_us") is not None]
+    if not ends:
+        return
+    before_us = max(ends) + 1
+    starts = [s["start_us"] for s in kept if s.get("start_us") is not None]
+    if starts:
+        before_us = min(before_us, min(starts))
+    # Imported here: both modules read logs through this one
+    from app.signal_index import prune_signal_index
+    from app.signal_rollup import prune_rollups
+    prune_signal_index(filepath, before_us)
+    prune_rollups(filepath, before_us, tiers=("minute",))
+
+
+def _remove_segment(directory: str, entry: Dict[str, Any]) -> None:
+    try:
+        os.remove(os.path.join(directory, entry["file"]))
+    except FileNotFoundError:
+        pass
+
+
+def maybe_rotate(filepath: str, policy: Optional[RotationPolicy] = None) -> None:
+    """
+    Rotates a JSONL log if it has crossed the policy limits. Other backends are left alone.
+    """
+    if not is_jsonl_path(filepath):
+        return
+    policy = policy or RotationPolicy.from_env()
+    if not should_rotate(filepath, policy):
+        return
+    with file_lock(filepath):
+        # Another writer may have rotated while we waited for the lock
+        if should_rotate(filepath, policy):
+            _rotate_locked(filepath, policy)
+
+
+def iter_log_range(filepath: str, start: TimeBound = None, end: TimeBound = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streams records with start <= timestamp < end across closed segments and the active log.
+    Segments whose manifest range lies entirely outside the window are never opened.
+    """
+    start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+
+    def in_range(record: Dict[str, Any]) -> bool:
+        ts = record_time_us(record)
+        if ts is None:
+            return start_us is None and end_us is None
+        return (start_us is None or ts >= start_us) and (end_us is None or ts < end_us)
+
+    directory = segment_dir(filepath)
+    for entry in load_manifest(filepath):
+        seg_start, seg_end = entry.get("start_us"), entry.get("end_us")
+        if seg_end is not None and start_us is not None and seg_end < start_us:
+            continue
+        if seg_start is not None and end_us is not None and seg_start >= end_us:
+            continue
+        for record in iter_segment(os.path.join(directory, entry["file"])):
+            if in_range(record):
+                yield record
+
+    for record in iter_jsonl(filepath):
+        if in_range(record):
+            yield record
+
+
+def read_last_records(filepath: str, n: int) -> List[Dict[str, Any]]:
+    """
+    Returns the newest n records in chronological order, continuing into
+    closed segments (newest first) when the active log holds fewer than n.
+    Legacy JSON array logs are never rotated and go through read_last.
+    """
+    if n <= 0:
+        return []
+    if not is_jsonl_path(filepath):
+        return read_last(filepath, n)
+    records = []
+    for record in iter_jsonl_reverse(filepath):
+        records.append(record)
+        if len(records) >= n:
+            return records[::-1]
+
+    directory = segment_dir(filepath)
+    for entry in reversed(load_manifest(filepath)):
+        needed = n - len(records)
+        tail = deque(iter_segment(os.path.join(directory, entry["file"])), maxlen=needed)
+        records.extend(reversed(tail))
+        if len(records) >= n:
+            break
+    return records[::-1]
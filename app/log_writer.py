@@ -0,0 +1,219 @@
+"""
+Background Log Writer — Moves signal and inference log writes off the Streamlit script thread.
+Records are queued, grouped per log file, and committed in one write per batch.
+
+Configuration (environment):
+    LOG_WRITER_BACKGROUND       "true" to queue writes on the background thread (default), "false" to write inline
+    LOG_WRITER_FLUSH_INTERVAL   Seconds to gather records before committing a batch (default 0.2)
+    LOG_WRITER_QUEUE_SIZE       Maximum queued records before submitters block (default 10000)
+    LOG_WRITER_FSYNC            "batch" to fsync file logs after every batch, "never" to leave it to the OS (default)
+    SIGNAL_INDEX_ENABLED        "true" to keep the binary signal sidecar (app/signal_index.py) up to date (default)
+    SIGNAL_ROLLUPS_ENABLED      "true" to maintain minute/hour/day rollups (app/signal_rollup.py) (default)
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils import append_jsonl_many, is_jsonl_path, update_json_array
+from app.sqlite_store import get_store, is_sqlite_path
+from app.log_rotation import maybe_rotate
+from app.signal_index import append_to_signal_index
+from app.signal_rollup import update_rollups
+
+SIGNAL_TABLE = "signals"
+INFERENCE_TABLE = "inferences"
+
+_FLUSH = object()
+_STOP = object()
+
+
+def write_records(records: List[Dict[str, Any]], filepath: str, table: str, fsync: bool = False) -> None:
+    """
+    Commits a batch of log records to the backend selected by the path.
+    Parameters:
+        records (List[Dict[str, Any]]): Records to persist, in order
+        filepath (str): ".db"/".sqlite" for the SQLite store, ".jsonl" for JSON Lines,
+            anything else for a legacy JSON array file
+        table (str): SIGNAL_TABLE or INFERENCE_TABLE, used by the SQLite store
+        fsync (bool): Force file-backed logs to disk before returning
+    """
+    if not records:
+        return
+
+    # The log is written first: if that fails, the sidecars must not claim the records
+    if is_sqlite_path(filepath):
+        store = get_store(filepath)
+        if table == SIGNAL_TABLE:
+            store.insert_signals(records)
+        else:
+            store.insert_inferences(records)
+    elif is_jsonl_path(filepath):
+        append_jsonl_many(records, filepath, fsync=fsync)
+    else:
+        update_json_array(filepath, records, indent=4)
+
+    if table == SIGNAL_TABLE and os.getenv("SIGNAL_INDEX_ENABLED", "true").lower() == "true":
+        append_to_signal_index(records, filepath)
+    if table == SIGNAL_TABLE and os.getenv("SIGNAL_ROLLUPS_ENABLED", "true").lower() == "true":
+        update_rollups(records, filepath)
+
+    if is_jsonl_path(filepath):
+        maybe_rotate(filepath)
+
+
+class LogWriter:
+    """
+    Single background thread that drains a bounded queue of log records.
+    Records that arrive within one flush interval are committed together.
+    """
+
+    def __init__(self, flush_interval: float = 0.2, queue_size: int = 10000,
+                 fsync_policy: str = "never", max_batch: int = 1000):
+        if fsync_policy not in ("batch", "never"):
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        # Makes the closed check and the queue put one step, so nothing is queued after _STOP
+        self._state_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="gemma-guard-log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Dict[str, Any], filepath: str, table: str) -> None:
+        """
+        Queues one record for the given log. Blocks only when the queue is full.
+        """
+        with self._state_lock:
+            if not self._closed:
+                # Copy so later mutation by the caller cannot race with serialization
+                self._queue.put((filepath, table, dict(record)))
+                return
+        write_records([record], filepath, table, fsync=self.fsync_policy == "batch")
+
+    def flush(self) -> None:
+        """
+        Blocks until every record submitted so far has been committed.
+        """
+        with self._state_lock:
+            if self._closed:
+                return
+            self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Commits outstanding records and stops the writer thread.
+        """
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[Tuple[str, str, Dict[str, Any]]] = []
+            markers = 1
+            stop = False
+
+            if item is _STOP:
+                stop = True
+            elif item is not _FLUSH:
+                batch.append(item)
+                # Gather whatever else arrives within the flush interval
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    markers += 1
+                    if item is _FLUSH:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+
+            self._commit(batch)
+            for _ in range(markers):
+                self._queue.task_done()
+            if stop:
+                self._drain()
+                return
+
+    def _drain(self) -> None:
+        # Records queued ahead of _STOP that the last batch did not take
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item not in (_FLUSH, _STOP):
+                leftovers.append(item)
+            self._queue.task_done()
+        self._commit(leftovers)
+
+    def _commit(self, batch: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for filepath, table, record in batch:
+            groups.setdefault((filepath, table), []).append(record)
+        for (filepath, table), records in groups.items():
+            try:
+                write_records(records, filepath, table, fsync=self.fsync_policy == "batch")
+            except Exception as e:
+                print(f"Error writing {len(records)} records to {filepath}: {e}")
+
+
+_writer: Optional[LogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def background_writes_enabled() -> bool:
+    return os.getenv("LOG_WRITER_BACKGROUND", "true").lower() == "true"
+
+
+def get_log_writer() -> LogWriter:
+    """
+    Returns the process-wide log writer, starting it on first use.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = LogWriter(
+                flush_interval=float(os.getenv("LOG_WRITER_FLUSH_INTERVAL", "0.2")),
+                queue_size=int(os.getenv("LOG_WRITER_QUEUE_SIZE", "10000")),
+                fsync_policy=os.getenv("LOG_WRITER_FSYNC", "never").lower(),
+            )
+            atexit.register(_writer.close)
+        return _writer
+
+
+def submit_record(record: Dict[str, Any], filepath: str, table: str) -> None:
+    """
+    Persists one log record, on the background writer when enabled or inline otherwise.
+    """
+    if background_writes_enabled():
+        get_log_writer().submit(record, filepath, table)
+    else:
+        write_records([record], filepath, table)
+
+
+def flush_logs() -> None:
+    """
+    Waits for queued log records to reach storage. No-op when nothing has been queued.
+    """
+    if _writer is not None:
+        _writer.flush()
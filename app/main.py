@@ -4,10 +4,8 @@ from pathlib import Path
 # Add the project root to the path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.pattern_mapper import map_traits_to_behavioral_pattern, display_pattern_profile
-from app.matcher import match_signal_to_profile
-from app.gemma_inference import run_inference
-from app.insight_generator import generate_insight
+from app.pattern_mapper import map_traits_to_behavioral_pattern, display_pattern_profile, get_chrono_profile
+from app.inference_pipeline import run_inference_pipeline
 
 import os
 import streamlit as st
@@ -20,6 +18,9 @@ load_dotenv()
 from app.signal_engine import get_current_signal, format_for_ollama_prompt
 from app.utils_data import append_signal_log
 from app.utils_format import summarize_signal_packet
+from app.signal_index import SignalIndex
+from app.log_writer import flush_logs
+from app.scr_detection import window_scr_features
 
 # Import Ollama health check
 import sys
@@ -27,7 +28,8 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 from private.llm_inference import check_ollama_health
 
-SIGNAL_LOG_PATH = "data/signal_log.json"
+SIGNAL_LOG_PATH = os.getenv("SIGNAL_LOG_PATH", "data/signal_log.jsonl")
+INFERENCE_LOG_PATH = os.getenv("INFERENCE_LOG_PATH", "data/inference_log.jsonl")
 os.makedirs("data", exist_ok=True)
 
 # Configure Streamlit for healing tech vibe
@@ -497,7 +499,6 @@ elif st.session_state.page == 4:
                 # Step 1: Import and setup
                 status_text.text("📊 Loading pattern analysis engine...")
                 progress_bar.progress(20)
-                from private.chrono_decoder import get_chrono_profile_without_biometrics
                 
                 # Step 2: Format date
                 status_text.text("📅 Processing timestamp information...")
@@ -507,7 +508,7 @@ elif st.session_state.page == 4:
                 # Step 3: Run analysis
                 status_text.text("🔍 Computing behavioral signature patterns...")
                 progress_bar.progress(70)
-                chrono_result = get_chrono_profile_without_biometrics(dob_formatted)
+                chrono_result = get_chrono_profile(dob_formatted)
                 
                 # Step 4: Generate insights
                 status_text.text("💡 Generating personalized insights...")
@@ -703,20 +704,22 @@ The challenge with this vibrant energy is that you may burn out quickly from ove
                 mapped_profile = map_traits_to_behavioral_pattern(dob_str)
                 pattern_tags = mapped_profile["pattern_tags"]
 
-                # Step 4: Run AI inference
+                # Step 4: Match signals, run Gemma AI inference and generate insights (logged once)
                 status_text.text("🤖 Running Gemma AI inference...")
                 progress_bar.progress(65)
-                inference_result = run_inference(pattern_tags, signal_packet)
-                
-                # Step 5: Match signals to profile
-                status_text.text("🎯 Matching signals to behavioral profile...")
-                progress_bar.progress(80)
-                match_result = match_signal_to_profile(signal_packet, pattern_tags)
+                pipeline_result = run_inference_pipeline(
+                    signal_packet,
+                    pattern_tags,
+                    save_to=INFERENCE_LOG_PATH,
+                    on_progress=lambda pct: progress_bar.progress(65 + pct * 30 // 100)
+                )
+                inference_result = pipeline_result["inference"]
+                match_result = pipeline_result["match_result"]
                 
-                # Step 6: Generate final insights
+                # Step 5: Generate final insights
                 status_text.text("💡 Generating personalized insights...")
                 progress_bar.progress(95)
-                final_insight = generate_insight(match_result, inference_result["inference"])
+                final_insight = pipeline_result["insight"]
                 prompt_text = format_for_ollama_prompt(signal_packet)
                 
                 # Create pattern summary for technical display
@@ -736,8 +739,7 @@ Timestamp: {signal_packet.get('timestamp', 'N/A')}"""
             
             # Get the signature name for detailed personality analysis
             dob_str_formatted = st.session_state.dob.strftime("%d/%m/%Y")
-            from private.chrono_decoder import get_chrono_profile_without_biometrics
-            chrono_result = get_chrono_profile_without_biometrics(dob_str_formatted)
+            chrono_result = get_chrono_profile(dob_str_formatted)
             
             if "error" not in chrono_result:
                 # Get the signature name for internal reference (but don't show Chinese name to user)
@@ -940,7 +942,16 @@ The challenge with this vibrant energy is that you may burn out quickly from ove
                     st.warning(f"{current_color} {current_status} - Elevated stress")
                 else:  # Very High
                     st.error(f"{current_color} {current_status} - High stress alert")
-            
+
+                # Phasic activity over the recent window of indexed readings
+                window_start = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=15)
+                flush_logs()  # the index sidecar is written with the queued log records
+                recent_eda = SignalIndex(SIGNAL_LOG_PATH).range(window_start)
+                if len(recent_eda) > 1:
+                    scr = window_scr_features(recent_eda, window_s=15 * 60)
+                    st.metric(label="SCR Peaks / min (15 min)", value=f"{scr['scr_per_min']:.1f}",
+                              help=f"{scr['scr_count']} skin conductance responses detected")
+
             # Educational legend for EDA levels
             st.markdown("📚 **Understanding EDA Stress Levels:**")
             
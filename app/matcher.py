@@ -1,35 +1,77 @@
 # 🎯 Gemma Guard — Trait Matcher Module
 # Analyzes biometric signal alignment against behavioral trait patterns
 
-def match_signal_to_profile(signal: dict, pattern_tags: list) -> dict:
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+
+import numpy as np
+
+from app.rule_engine import get_rules
+
+def match_signal_to_profile(signal: dict, pattern_tags: list, rules_path: Optional[str] = None,
+                            use_defaults: bool = True) -> dict:
     """
     Evaluates alignment between signal input and mapped behavioral traits.
     Identifies mismatch markers and returns status classification.
+    Mismatch rules come from the declarative rule table (rules/matcher_rules.json by default).
 
     Parameters:
-        signal (dict): Signal packet from signal_engine.get_current_signal()
+        signal (dict): Signal packet from signal_engine.get_current_signal();
+            optional channels (heart_rate, hrv_rmssd) are only checked when present
         pattern_tags (list): Trait-based pattern tags from pattern_mapper.py
+        rules_path (str): Alternative rule table file
+        use_defaults (bool): Fill missing fields with the rule table's defaults; recorded
+            packets pass False, since a missing channel there means no data
 
     Returns:
         dict: Match evaluation including status and mismatch descriptors
     """
-    mismatches = []
-
-    # Introvert-aligned users may show overstimulation if EDA is too high
-    if "introvert-aligned" in pattern_tags and signal.get("skin_conductance", 0) > 4.5:
-        mismatches.append("overstimulated_response")
-
-    # Morning-energy profiles underperform with low EDA early in the day
-    if "early-peak" in pattern_tags and signal.get("skin_conductance", 0) < 1.5:
-        mismatches.append("underactive_morning")
-
-    # Restrictive environmental states + reactive traits may signal burnout pressure
-    if "reactive" in pattern_tags and signal.get("environmental_state") == "restrictive":
-        mismatches.append("emotional_constraint")
+    mismatches = get_rules(rules_path).evaluate(signal, pattern_tags, use_defaults)
 
     status = "aligned" if not mismatches else "misaligned"
 
     return {
         "status": status,
         "mismatches": mismatches
-    }
\ No newline at end of file
+    }
+
+def _as_columns(signals) -> Dict[str, np.ndarray]:
+    if isinstance(signals, np.ndarray) and signals.dtype.names:
+        return {name: signals[name] for name in signals.dtype.names}
+    return {name: np.asarray(values) for name, values in signals.items()}
+
+def match_batch(signals: Union[np.ndarray, Mapping[str, Any]],
+                profiles: Union[Mapping[str, Iterable[str]], Iterable[Iterable[str]]],
+                rules_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Scores many signals against many profiles in one vectorized pass.
+    Signal predicates are evaluated once over all readings; each profile then only
+    selects which rules apply to it.
+
+    Parameters:
+        signals: Columnar readings, either a structured array (e.g. generate_signal_batch(),
+            SIGNAL_SAMPLE_DTYPE chunks) or a dict of equal-length arrays keyed by field name
+        profiles: {profile_id: pattern_tags}, or a sequence of pattern tag lists
+        rules_path (str): Alternative rule table file
+
+    Returns:
+        dict: labels (mismatch per rule), profile_ids, mismatches bool (profiles, signals, rules),
+            misaligned bool (profiles, signals) and counts int (profiles, rules)
+    """
+    rules = get_rules(rules_path)
+    if isinstance(profiles, Mapping):
+        profile_ids, tag_sets = list(profiles.keys()), list(profiles.values())
+    else:
+        tag_sets = list(profiles)
+        profile_ids = list(range(len(tag_sets)))
+
+    signal_masks = rules.signal_masks(_as_columns(signals))   # (signals, rules)
+    tag_masks = rules.tag_masks(tag_sets)                     # (profiles, rules)
+    mismatches = tag_masks[:, None, :] & signal_masks[None, :, :]
+
+    return {
+        "labels": rules.labels,
+        "profile_ids": profile_ids,
+        "mismatches": mismatches,
+        "misaligned": mismatches.any(axis=2),
+        "counts": mismatches.sum(axis=1),
+    }
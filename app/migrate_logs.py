@@ -0,0 +1,69 @@
+"""
+Log Migration Tool — Converts legacy JSON array logs into append-only JSON Lines logs.
+One-shot helper for moving existing data/*.json history onto the JSONL backend.
+
+Usage:
+    python -m app.migrate_logs                      # migrate the default signal and inference logs
+    python -m app.migrate_logs data/signal_log.json # migrate specific files
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+sys.path.append(str(Path(__file__).parent.parent))
+from app.utils import atomic_write_text, file_lock, load_json
+
+DEFAULT_LOG_PATHS = ["data/signal_log.json", "data/inference_log.json"]
+
+
+def migrate_json_array(source: str, destination: Optional[str] = None, overwrite: bool = False) -> int:
+    """
+    Rewrites a JSON array log as a JSON Lines log, one record per line.
+    Parameters:
+        source (str): Path to the legacy JSON array file
+        destination (str): Target JSONL path, defaults to the source path with a ".jsonl" extension
+        overwrite (bool): Replace an existing destination instead of refusing
+    Returns:
+        int: Number of records written
+    """
+    destination = destination or str(Path(source).with_suffix(".jsonl"))
+
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Log file not found: {source}")
+    if os.path.exists(destination) and not overwrite:
+        raise FileExistsError(f"Destination already exists: {destination}")
+
+    records = load_json(source, default=[])
+    if not isinstance(records, list):
+        raise ValueError(f"Expected a JSON array in {source}")
+
+    # Atomic replace so an interrupted run never leaves a partial log behind
+    with file_lock(destination):
+        atomic_write_text("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records), destination)
+
+    return len(records)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert JSON array logs to JSON Lines logs.")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_LOG_PATHS, help="Legacy JSON array logs to migrate")
+    parser.add_argument("--overwrite", action="store_true", help="Replace existing .jsonl files")
+    args = parser.parse_args(argv)
+
+    exit_code = 0
+    for path in args.paths:
+        try:
+            count = migrate_json_array(path, overwrite=args.overwrite)
+            print(f"✅ {path} → {Path(path).with_suffix('.jsonl')} ({count} records)")
+        except (FileNotFoundError, FileExistsError, ValueError) as e:
+            print(f"⚠️ Skipped {path}: {e}")
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
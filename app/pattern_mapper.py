@@ -5,7 +5,6 @@ Supports both signal matching and AI feedback interfaces.
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from private.core_logic_real import get_chrono_signature_profile
 
 
 def map_traits_to_behavioral_pattern(dob: str) -> dict:
@@ -15,8 +14,25 @@ def map_traits_to_behavioral_pattern(dob: str) -> dict:
         dob (str): User's date of birth in "YYYY-MM-DD" format.
     Returns:
         dict: Chrono-Signature profile including tags and rationale.
+    Served from the shared profile cache, then the precomputed chrono table (see app/chrono_table.py).
     """
-    return get_chrono_signature_profile(dob)
+    from app.chrono_table import ENGINES, get_chrono_table
+    from app.profile_cache import cached_profile
+    return cached_profile("pattern", ENGINES["pattern"].version(), dob, get_chrono_table("pattern").lookup)
+
+
+def get_chrono_profile(dob: str) -> dict:
+    """
+    Cached get_chrono_profile_without_biometrics() from the private chrono decoder.
+    Parameters:
+        dob (str): User's date of birth in "DD/MM/YYYY" format.
+    Returns:
+        dict: Chrono-signature profile, or {"error": ...} for an invalid date.
+    """
+    import private.chrono_decoder as decoder
+    from app.profile_cache import cached_profile
+    version = str(getattr(decoder, "ENGINE_VERSION", getattr(decoder, "__version__", "1")))
+    return cached_profile("chrono_decoder", version, dob, decoder.get_chrono_profile_without_biometrics)
 
 
 def display_pattern_profile(profile_data: dict) -> str:
@@ -0,0 +1,97 @@
+"""
+Profile Cache — Shared, bounded LRU cache for chrono-profile engines.
+Entries are keyed by (engine, engine version, date of birth), so a profile is computed once per
+process and reused by every Streamlit rerun and session, while an engine upgrade simply stops
+matching the old keys. Callers get their own copy of each cached profile.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.chrono_table import copy_profile
+
+DEFAULT_PROFILE_CACHE_SIZE = 1024
+
+
+class ProfileCache:
+    def __init__(self, maxsize: int = DEFAULT_PROFILE_CACHE_SIZE):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns a copy of the cached value for key, computing and storing it on a miss.
+        Engines are not called under the lock; two threads missing the same key at once may
+        both compute it, and the second result replaces the first.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy_profile(self._entries[key])
+            self.misses += 1
+
+        value = compute()
+        if isinstance(value, dict) and "error" in value:
+            return value  # Invalid input: don't let bad dates fill the cache
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return copy_profile(value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+_cache: Optional[ProfileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> ProfileCache:
+    """
+    Returns the process-wide profile cache, created on first use so PROFILE_CACHE_SIZE
+    can come from a .env loaded after this module was imported.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ProfileCache(int(os.getenv("PROFILE_CACHE_SIZE", str(DEFAULT_PROFILE_CACHE_SIZE))))
+    return _cache
+
+
+def cached_profile(engine: str, version: str, dob: str, compute: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Returns compute(dob) through the shared cache under the key (engine, version, dob).
+    """
+    key: Tuple[str, str, str] = (engine, version, dob)
+    return get_profile_cache().get_or_compute(key, lambda: compute(dob))
@@ -0,0 +1,254 @@
+# ⚖️ Gemma Guard — Matcher Rule Engine
+# Loads the declarative rule table (rules/matcher_rules.json) and compiles it once into an
+# evaluation plan: identical signal predicates are shared across rules, tag requirements become
+# bitmasks from the tag registry, and the rules that apply to a given tag mask are resolved once
+# per mask, so a signal only pays for the rules its profile can actually trigger. The same plan
+# evaluates NumPy columns of many signals.
+
+import json
+import operator
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.signal_engine import ENVIRONMENTAL_STATES
+from app.tag_registry import get_tag_registry
+
+DEFAULT_RULES_PATH = str(Path(__file__).parent.parent / "rules" / "matcher_rules.json")
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_MISSING = object()
+
+
+class Predicate:
+    """
+    One signal test: `signal[field] <op> value`. A missing field uses `default` when the
+    rule gives one and the caller allows defaults; otherwise the predicate is false.
+    """
+
+    __slots__ = ("field", "op", "value", "default")
+
+    def __init__(self, field: str, op: str, value: Any, default: Any = _MISSING):
+        if op not in OPERATORS and op != "in":
+            raise ValueError(f"Unsupported operator in rule table: {op!r}")
+        self.field = field
+        self.op = op
+        self.value = tuple(value) if op == "in" else value
+        self.default = default
+
+    def key(self) -> Tuple:
+        return (self.field, self.op, self.value, None if self.default is _MISSING else ("d", self.default))
+
+    def test(self, signal: Mapping[str, Any], use_default: bool = True) -> bool:
+        value = signal.get(self.field)
+        if value is None:
+            if self.default is _MISSING or not use_default:
+                return False
+            value = self.default
+        if self.op == "in":
+            return value in self.value
+        return OPERATORS[self.op](value, self.value)
+
+    def test_columns(self, columns: Mapping[str, np.ndarray], n: int) -> np.ndarray:
+        values = columns.get(self.field)
+        target = self.value
+        if values is None and self.field == "environmental_state" and "state_code" in columns:
+            # Compare compact state codes instead of strings
+            values = columns["state_code"]
+            codes = [ENVIRONMENTAL_STATES.index(v) for v in (target if self.op == "in" else (target,))
+                     if v in ENVIRONMENTAL_STATES]
+            target = tuple(codes) if self.op == "in" else (codes[0] if codes else -1)
+        if values is None:
+            fill = self.default is not _MISSING and Predicate(self.field, self.op, self.value).test(
+                {self.field: self.default})
+            return np.full(n, fill, dtype=bool)
+
+        values = np.asarray(values)
+        missing = np.isnan(values) if values.dtype.kind == "f" else None
+        if missing is not None and missing.any() and self.default is not _MISSING:
+            values = np.where(missing, self.default, values)
+            missing = None
+        if self.op == "in":
+            result = np.isin(values, np.asarray(target))
+        else:
+            result = OPERATORS[self.op](values, target)
+        result = np.asarray(result, dtype=bool)
+        if missing is not None:
+            result &= ~missing
+        return result
+
+
+class Rule:
+    __slots__ = ("mismatch", "description", "all_mask", "any_mask", "none_mask", "predicates")
+
+    def __init__(self, mismatch: str, predicate_ids: List[int], tags_all: Iterable[str] = (),
+                 tags_any: Iterable[str] = (), tags_none: Iterable[str] = (), description: str = ""):
+        registry = get_tag_registry()
+        self.mismatch = mismatch
+        self.description = description
+        self.all_mask = registry.mask(tags_all)
+        self.any_mask = registry.mask(tags_any)
+        self.none_mask = registry.mask(tags_none)
+        self.predicates = tuple(predicate_ids)
+
+    def applies_to(self, tag_mask: int) -> bool:
+        return (tag_mask & self.all_mask == self.all_mask
+                and (not self.any_mask or bool(tag_mask & self.any_mask))
+                and not tag_mask & self.none_mask)
+
+
+class RuleSet:
+    """
+    Compiled rule table. Rules keep file order, which is the order mismatches are reported in.
+    """
+
+    def __init__(self, rules: List[Rule], predicates: List[Predicate]):
+        self.rules = rules
+        self.predicates = predicates
+        self.labels = [rule.mismatch for rule in rules]
+        self._applicable = lru_cache(maxsize=1024)(self._resolve_applicable)
+        self._by_tags: Dict[Tuple[str, ...], Tuple[int, ...]] = {}
+
+    def _resolve_applicable(self, tag_mask: int) -> Tuple[int, ...]:
+        return tuple(i for i, rule in enumerate(self.rules) if rule.applies_to(tag_mask))
+
+    def applicable(self, pattern_tags: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Indexes of the rules a tag set can trigger (cached per distinct tag mask).
+        """
+        key = tuple(pattern_tags)
+        cached = self._by_tags.get(key)
+        if cached is None:
+            if len(self._by_tags) >= 1024:
+                self._by_tags.clear()
+            cached = self._by_tags[key] = self._applicable(get_tag_registry().mask(key))
+        return cached
+
+    def evaluate(self, signal: Mapping[str, Any], pattern_tags: Iterable[str],
+                 use_defaults: bool = True) -> List[str]:
+        """
+        Returns the mismatch labels one signal triggers for one profile. With use_defaults=False
+        a rule never fires on a field the signal doesn't carry.
+        """
+        results: Dict[int, bool] = {}
+        mismatches = []
+        for index in self.applicable(pattern_tags):
+            rule = self.rules[index]
+            for pid in rule.predicates:
+                if pid not in results:
+                    results[pid] = self.predicates[pid].test(signal, use_defaults)
+                if not results[pid]:
+                    break
+            else:
+                mismatches.append(rule.mismatch)
+        return mismatches
+
+    def signal_masks(self, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluates every rule's signal predicates over columnar signals, ignoring tags.
+        Returns a boolean array shaped (n_signals, n_rules).
+        """
+        n = len(next(iter(columns.values()))) if columns else 0
+        predicate_masks = [p.test_columns(columns, n) for p in self.predicates]
+        masks = np.ones((n, len(self.rules)), dtype=bool)
+        for r, rule in enumerate(self.rules):
+            for pid in rule.predicates:
+                masks[:, r] &= predicate_masks[pid]
+        return masks
+
+    def tag_masks(self, tag_sets: Iterable[Iterable[str]]) -> np.ndarray:
+        """
+        Returns a boolean array shaped (n_profiles, n_rules): which rules each profile can trigger.
+        """
+        profile_masks = get_tag_registry().mask_array(tag_sets)[:, None]
+        kind = profile_masks.dtype if profile_masks.dtype != object else None
+
+        def rule_column(attr):
+            return np.array([getattr(rule, attr) for rule in self.rules], dtype=kind)[None, :]
+
+        all_masks, any_masks, none_masks = rule_column("all_mask"), rule_column("any_mask"), rule_column("none_mask")
+        applicable = (profile_masks & all_masks) == all_masks
+        applicable &= ((profile_masks & any_masks) != 0) | (any_masks == 0)
+        applicable &= (profile_masks & none_masks) == 0
+        return np.asarray(applicable, dtype=bool).reshape(len(profile_masks), len(self.rules))
+
+    def evaluate_columns(self, columns: Mapping[str, np.ndarray], pattern_tags: Iterable[str]) -> np.ndarray:
+        """
+        Vectorized evaluate(): (n_signals, n_rules) mask of triggered rules for one profile.
+        """
+        return self.signal_masks(columns) & self.tag_masks([pattern_tags])[0]
+
+
+def compile_rules(table: Mapping[str, Any]) -> RuleSet:
+    """
+    Compiles a parsed rule table, sharing identical predicates between rules.
+    """
+    predicates: List[Predicate] = []
+    predicate_ids: Dict[Tuple, int] = {}
+    rules = []
+    for entry in table.get("rules", []):
+        ids = []
+        for spec in entry.get("signal", []):
+            predicate = Predicate(spec["field"], spec["op"], spec["value"], spec.get("default", _MISSING))
+            key = predicate.key()
+            if key not in predicate_ids:
+                predicate_ids[key] = len(predicates)
+                predicates.append(predicate)
+            ids.append(predicate_ids[key])
+        rules.append(Rule(entry["mismatch"], ids, entry.get("tags_all", ()), entry.get("tags_any", ()),
+                          entry.get("tags_none", ()), entry.get("description", "")))
+    return RuleSet(rules, predicates)
+
+
+def rules_path() -> str:
+    """
+    Returns the configured rule table. Read on every call so a MATCHER_RULES_PATH loaded from
+    .env after this module was imported still applies.
+    """
+    return os.getenv("MATCHER_RULES_PATH", DEFAULT_RULES_PATH)
+
+
+def load_rules(path: Optional[str] = None) -> RuleSet:
+    with open(path or rules_path(), "r", encoding="utf-8") as f:
+        return compile_rules(json.load(f))
+
+
+# How often get_rules() looks at the table file's mtime for edits
+RULES_RELOAD_CHECK_SECONDS = 1.0
+
+_rule_cache: Dict[str, Tuple[int, float, RuleSet]] = {}
+_rule_paths: Dict[str, str] = {}
+_rule_cache_lock = threading.Lock()
+
+
+def get_rules(path: Optional[str] = None) -> RuleSet:
+    """
+    Returns the compiled rule set for a table file. The file is re-checked at most once per
+    RULES_RELOAD_CHECK_SECONDS and recompiled only when it has changed.
+    """
+    path = path or rules_path()
+    now = time.monotonic()
+    with _rule_cache_lock:
+        # Cache by absolute path, so the default and the same path given explicitly share one entry
+        table_path = _rule_paths.get(path)
+        if table_path is None:
+            table_path = _rule_paths[path] = os.path.abspath(path)
+        cached = _rule_cache.get(table_path)
+        if cached is not None and now - cached[1] < RULES_RELOAD_CHECK_SECONDS:
+            return cached[2]
+        mtime = os.stat(table_path).st_mtime_ns
+        rules = cached[2] if cached is not None and cached[0] == mtime else load_rules(table_path)
+        _rule_cache[table_path] = (mtime, now, rules)
+        return rules
@@ -0,0 +1,171 @@
+"""
+SCR Detection — Finds skin conductance responses (phasic peaks) in EDA windows.
+A response runs from an onset (local minimum) to the next local maximum of the lightly
+smoothed signal; it counts when its amplitude reaches min_amplitude and it rises within
+max_rise_s. Detection is vectorized over whole arrays, and SCRDetector applies it to a
+stream chunk by chunk, carrying only the unfinished rise between chunks.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+SCR_PEAK_DTYPE = np.dtype([
+    ("onset_ns", "<i8"),
+    ("peak_ns", "<i8"),
+    ("amplitude", "<f4"),
+    ("rise_time_s", "<f4"),
+])
+
+DEFAULT_MIN_AMPLITUDE = 0.05   # µS
+DEFAULT_MAX_RISE_S = 5.0
+DEFAULT_SMOOTH_SAMPLES = 4
+
+
+def _smooth(values: np.ndarray, history: np.ndarray, width: int) -> np.ndarray:
+    # Causal moving average; `history` supplies the width - 1 samples preceding `values`
+    if width <= 1:
+        return values.astype(np.float64)
+    padded = np.concatenate([history, values]).astype(np.float64)
+    needed = len(values) + width - 1
+    if len(padded) < needed:
+        # Start of the stream: repeat the first sample so every output has a full window
+        padded = np.concatenate([np.full(needed - len(padded), padded[0]), padded])
+    # Each output sums its own window (not a running cumsum), so a sample's smoothed value is
+    # bit-identical however the stream was chunked
+    windows = np.lib.stride_tricks.sliding_window_view(padded, width)
+    return (windows.sum(axis=1) / width)[-len(values):]
+
+
+def _find_peaks(timestamps_ns: np.ndarray, smoothed: np.ndarray, min_amplitude: float,
+                max_rise_s: float, starts_mid_rise: bool = False) -> Tuple[np.ndarray, int]:
+    """
+    Returns (peaks, resume_index): the confirmed peaks, and the index from which samples
+    must be kept to finish a rise that is still in progress at the end of the array.
+    starts_mid_rise means the first sample is inside a rise whose onset was discarded,
+    so it must not be taken as an onset.
+    """
+    n = len(smoothed)
+    if n < 2:
+        return np.empty(0, dtype=SCR_PEAK_DTYPE), 0
+    rising = np.diff(smoothed) > 0
+    # Onset: rise begins (index 0 counts when the array starts rising). Peak: rise ends.
+    onsets = np.flatnonzero(np.r_[rising[0] and not starts_mid_rise, ~rising[:-1] & rising[1:]])
+    peaks = np.flatnonzero(rising[:-1] & ~rising[1:]) + 1
+
+    if len(onsets) and (not len(peaks) or onsets[-1] > peaks[-1]):
+        resume = int(onsets[-1])
+    else:
+        resume = n - 1
+
+    if not len(peaks) or not len(onsets):
+        return np.empty(0, dtype=SCR_PEAK_DTYPE), resume
+    owner = np.searchsorted(onsets, peaks, side="right") - 1
+    valid = owner >= 0
+    peaks, starts = peaks[valid], onsets[owner[valid]]
+
+    amplitude = smoothed[peaks] - smoothed[starts]
+    rise_s = (timestamps_ns[peaks] - timestamps_ns[starts]) / 1e9
+    keep = (amplitude >= min_amplitude) & (rise_s <= max_rise_s)
+
+    result = np.empty(int(keep.sum()), dtype=SCR_PEAK_DTYPE)
+    result["onset_ns"] = timestamps_ns[starts[keep]]
+    result["peak_ns"] = timestamps_ns[peaks[keep]]
+    result["amplitude"] = amplitude[keep]
+    result["rise_time_s"] = rise_s[keep]
+    return result, resume
+
+
+def detect_scr_peaks(timestamps_ns: np.ndarray, skin_conductance: np.ndarray,
+                     min_amplitude: float = DEFAULT_MIN_AMPLITUDE, max_rise_s: float = DEFAULT_MAX_RISE_S,
+                     smooth_samples: int = DEFAULT_SMOOTH_SAMPLES) -> np.ndarray:
+    """
+    Detects SCR peaks in one window of readings.
+    Parameters:
+        timestamps_ns (np.ndarray): Sample times, epoch nanoseconds, ascending
+        skin_conductance (np.ndarray): EDA values in µS
+        min_amplitude (float): Smallest onset-to-peak rise that counts as a response
+        max_rise_s (float): Longest onset-to-peak time that counts as a response
+        smooth_samples (int): Moving-average width applied before detection
+    Returns:
+        np.ndarray: SCR_PEAK_DTYPE records, one per response
+    """
+    values = np.asarray(skin_conductance)
+    if len(values) == 0:
+        return np.empty(0, dtype=SCR_PEAK_DTYPE)
+    smoothed = _smooth(values, values[:0], smooth_samples)
+    peaks, _ = _find_peaks(np.asarray(timestamps_ns), smoothed, min_amplitude, max_rise_s)
+    return peaks
+
+
+class SCRDetector:
+    """
+    Incremental SCR detection for one stream. Each call to process() only looks at the
+    new chunk plus the samples of a rise left unfinished by the previous chunk.
+    """
+
+    def __init__(self, min_amplitude: float = DEFAULT_MIN_AMPLITUDE, max_rise_s: float = DEFAULT_MAX_RISE_S,
+                 smooth_samples: int = DEFAULT_SMOOTH_SAMPLES):
+        self.min_amplitude = min_amplitude
+        self.max_rise_s = max_rise_s
+        self.smooth_samples = smooth_samples
+        self._raw_history = np.empty(0, dtype=np.float64)
+        self._tail_ts = np.empty(0, dtype=np.int64)
+        self._tail_smoothed = np.empty(0, dtype=np.float64)
+        self._tail_mid_rise = False  # the carried sample is inside a rise whose onset was dropped
+
+    def process(self, timestamps_ns: np.ndarray, skin_conductance: np.ndarray) -> np.ndarray:
+        """
+        Returns the SCR peaks confirmed by this chunk (SCR_PEAK_DTYPE).
+        """
+        values = np.asarray(skin_conductance, dtype=np.float64)
+        if len(values) == 0:
+            return np.empty(0, dtype=SCR_PEAK_DTYPE)
+        smoothed = _smooth(values, self._raw_history, self.smooth_samples)
+        self._raw_history = np.concatenate([self._raw_history, values])[-(self.smooth_samples - 1):] \
+            if self.smooth_samples > 1 else self._raw_history
+
+        timestamps = np.concatenate([self._tail_ts, np.asarray(timestamps_ns, dtype=np.int64)])
+        smoothed = np.concatenate([self._tail_smoothed, smoothed])
+        peaks, resume = _find_peaks(timestamps, smoothed, self.min_amplitude, self.max_rise_s,
+                                    self._tail_mid_rise)
+
+        # A rise older than max_rise_s can no longer produce a valid peak; drop it to bound the carry
+        if timestamps[-1] - timestamps[resume] > self.max_rise_s * 1e9:
+            resume = len(timestamps) - 1
+        if len(timestamps) >= 2:
+            self._tail_mid_rise = resume == len(timestamps) - 1 and smoothed[-1] > smoothed[-2]
+        self._tail_ts = timestamps[resume:]
+        self._tail_smoothed = smoothed[resume:]
+        return peaks
+
+    def process_samples(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Same as process() for a SIGNAL_SAMPLE_DTYPE chunk.
+        """
+        return self.process(samples["timestamp_ns"], samples["skin_conductance"])
+
+
+def scr_features(peaks: np.ndarray, window_s: float) -> Dict[str, Any]:
+    """
+    Summarises detected peaks over a window of window_s seconds as stress features.
+    """
+    count = len(peaks)
+    return {
+        "scr_count": count,
+        "scr_per_min": count / (window_s / 60.0) if window_s > 0 else 0.0,
+        "mean_amplitude": float(peaks["amplitude"].mean()) if count else None,
+        "max_amplitude": float(peaks["amplitude"].max()) if count else None,
+        "mean_rise_time_s": float(peaks["rise_time_s"].mean()) if count else None,
+    }
+
+
+def window_scr_features(samples: np.ndarray, window_s: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Detects peaks in a SIGNAL_SAMPLE_DTYPE window and returns its scr_features.
+    The window length defaults to the span of the samples.
+    """
+    peaks = detect_scr_peaks(samples["timestamp_ns"], samples["skin_conductance"], **kwargs)
+    if window_s is None:
+        window_s = (int(samples["timestamp_ns"][-1]) - int(samples["timestamp_ns"][0])) / 1e9 if len(samples) > 1 else 0.0
+    return scr_features(peaks, window_s)
@@ -0,0 +1,104 @@
+"""
+Signal Buffer — Fixed-capacity ring buffer of recent readings per user.
+Readings live in one preallocated SIGNAL_SAMPLE_DTYPE array, so memory per user is constant
+however long the process runs. Each reading is written twice, at slot i and i + capacity,
+which keeps the latest n readings contiguous: window(n) is a slice view, never a copy.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.signal_engine import SIGNAL_SAMPLE_DTYPE
+from app.signal_index import STATE_CODES, UNKNOWN_STATE_CODE, decode_states
+from app.sqlite_store import to_epoch_us
+
+DEFAULT_BUFFER_CAPACITY = 4096
+
+
+class SignalRingBuffer:
+    """
+    Holds the most recent `capacity` readings in time-of-arrival order.
+    Views returned by window() alias the buffer; copy them if they must outlive
+    the next `capacity` appends.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_BUFFER_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=SIGNAL_SAMPLE_DTYPE)
+        self._next = 0  # slot in [0, capacity) the next reading goes to
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp_ns: int, skin_conductance: float, state_code: int) -> None:
+        """
+        Adds one reading in O(1), overwriting the oldest once the buffer is full.
+        """
+        row = (timestamp_ns, skin_conductance, state_code)
+        with self._lock:
+            self._data[self._next] = row
+            self._data[self._next + self.capacity] = row
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def append_signal(self, signal: Dict[str, Any]) -> None:
+        """
+        Adds a signal packet (timestamp_utc, skin_conductance, environmental_state).
+        """
+        ts_us = to_epoch_us(signal.get("timestamp_utc"))
+        if ts_us is None:
+            return
+        eda = signal.get("skin_conductance")
+        self.append(ts_us * 1000, np.nan if eda is None else float(eda),
+                    STATE_CODES.get(signal.get("environmental_state"), UNKNOWN_STATE_CODE))
+
+    def window(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the latest n readings (all when n is None), oldest first, as a view.
+        """
+        with self._lock:
+            n = self._count if n is None else max(0, min(n, self._count))
+            end = self._next + self.capacity
+            return self._data[end - n:end]
+
+    def latest(self) -> Optional[np.void]:
+        window = self.window(1)
+        return window[0] if len(window) else None
+
+    def states(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Returns environmental_state strings for the latest n readings.
+        """
+        return decode_states(self.window(n)["state_code"])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._next = 0
+            self._count = 0
+
+
+_buffers: Dict[str, SignalRingBuffer] = {}
+_buffers_lock = threading.Lock()
+
+
+def get_signal_buffer(user_id: str, capacity: Optional[int] = None) -> SignalRingBuffer:
+    """
+    Returns the process-wide ring buffer for a user, creating it on first use. The capacity
+    defaults to SIGNAL_BUFFER_CAPACITY, read at creation so a .env loaded after this module
+    was imported still applies.
+    """
+    with _buffers_lock:
+        buffer = _buffers.get(user_id)
+        if buffer is None:
+            if capacity is None:
+                capacity = int(os.getenv("SIGNAL_BUFFER_CAPACITY", str(DEFAULT_BUFFER_CAPACITY)))
+            buffer = SignalRingBuffer(capacity)
+            _buffers[user_id] = buffer
+        return buffer
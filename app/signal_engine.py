@@ -1,36 +1,182 @@
 # 📡 Gemma Guard — Signal Engine
 # Simulates scientific biometrics and behavioral stimulus context for inference modeling
+# All randomness comes from one NumPy Generator; set SIGNAL_SEED (or call seed_signals) to replay
+# an identical sequence of signals, states and ids.
 
-import random
+import os
+import threading
 from datetime import datetime, timezone
 import uuid
 
-def simulate_skin_conductance():
+import numpy as np
+
+# Stimulus vocabulary; position in this tuple is the compact state code used by binary indexes
+ENVIRONMENTAL_STATES = ("expansive", "restrictive", "neutral", "charged")
+
+# Packed per-sample layout shared by streaming simulators and the binary signal index
+SIGNAL_SAMPLE_DTYPE = np.dtype([
+    ("timestamp_ns", "<i8"),
+    ("skin_conductance", "<f4"),
+    ("state_code", "u1"),
+])
+
+# Columnar layout for bulk-generated signals; signal_id holds the raw 16 bytes of a UUID
+SIGNAL_BATCH_DTYPE = np.dtype([
+    ("timestamp_ns", "<i8"),
+    ("skin_conductance", "<f4"),
+    ("state_code", "u1"),
+    ("signal_id", "V16"),
+])
+
+_rng_lock = threading.RLock()
+_rng = None
+
+def seed_signals(seed=None):
+    """
+    Resets the shared simulation generator. None falls back to SIGNAL_SEED, then to OS entropy.
+    Returns the new generator.
+    """
+    global _rng
+    if seed is None:
+        env_seed = os.getenv("SIGNAL_SEED", "").strip()
+        seed = int(env_seed) if env_seed else None
+    with _rng_lock:
+        _rng = np.random.default_rng(seed)
+        return _rng
+
+def get_signal_rng():
+    """
+    Returns the shared simulation generator, creating it from SIGNAL_SEED on first use.
+    """
+    with _rng_lock:
+        return _rng if _rng is not None else seed_signals()
+
+def spawn_signal_rng():
+    """
+    Returns an independent generator derived from the shared one, for simulators that
+    draw many values (e.g. per-user streams) and should not interleave with it.
+    """
+    with _rng_lock:
+        return np.random.default_rng(get_signal_rng().integers(2**63))
+
+def simulate_skin_conductance(rng=None):
     """
     Simulates electrodermal activity (EDA) in microsiemens (µS).
     Range derived from psychophysiological baseline: 0.5 – 6.0 µS.
     """
-    return round(random.uniform(0.5, 6.0), 2)
+    with _rng_lock:
+        return round(float((rng if rng is not None else get_signal_rng()).uniform(0.5, 6.0)), 2)
 
-def simulate_environmental_state():
+def simulate_environmental_state(rng=None):
     """
     Simulates environmental rhythm index based on abstract stimulus exposure.
     Designed to reflect behavioral load in scientific language.
     """
-    return random.choice(["expansive", "restrictive", "neutral", "charged"])
+    with _rng_lock:
+        return ENVIRONMENTAL_STATES[int((rng if rng is not None else get_signal_rng()).integers(len(ENVIRONMENTAL_STATES)))]
 
-def get_current_signal():
+def simulate_cardiac(skin_conductance, rng=None):
+    """
+    Simulates heart rate (bpm) and HRV as RMSSD (ms) loosely coupled to arousal:
+    higher EDA tends to come with a faster heart rate and suppressed HRV.
+    """
+    arousal = (skin_conductance - 0.5) / 5.5
+    with _rng_lock:
+        noise = (rng if rng is not None else get_signal_rng()).normal(0.0, 1.0, 2)
+    heart_rate = 62 + 38 * arousal + 6 * noise[0]
+    hrv_rmssd = 65 - 40 * arousal + 8 * noise[1]
+    return round(float(np.clip(heart_rate, 45, 160)), 1), round(float(np.clip(hrv_rmssd, 8, 120)), 1)
+
+def simulate_signal_id(rng=None):
+    """
+    Draws a version 4 UUID from the generator instead of os.urandom, so ids replay with the seed.
+    """
+    with _rng_lock:
+        id_bytes = (rng if rng is not None else get_signal_rng()).bytes(16)
+    return str(uuid.UUID(bytes=id_bytes, version=4))
+
+def get_current_signal(rng=None, timestamp=None):
     """
     Generates a unified signal snapshot for inference and logging.
     Output is formatted for Gemma inference and Ollama prompt wrapping.
+    Alongside EDA it carries heart_rate (bpm) and hrv_rmssd (ms) channels.
+
+    Parameters:
+        rng (np.random.Generator | None): Random source, defaults to the shared seeded generator
+        timestamp (datetime | None): Reading time, defaults to now (UTC); fix it for exact replays
     """
+    # One lock across all draws: concurrent callers get whole packets, never interleaved values
+    with _rng_lock:
+        rng = rng if rng is not None else get_signal_rng()
+        signal_id = simulate_signal_id(rng)
+        skin_conductance = simulate_skin_conductance(rng)
+        environmental_state = simulate_environmental_state(rng)
+        heart_rate, hrv_rmssd = simulate_cardiac(skin_conductance, rng)
     return {
-        "signal_id": str(uuid.uuid4()),
-        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-        "skin_conductance": simulate_skin_conductance(),
-        "environmental_state": simulate_environmental_state()
+        "signal_id": signal_id,
+        "timestamp_utc": (timestamp or datetime.now(timezone.utc)).isoformat(),
+        "skin_conductance": skin_conductance,
+        "environmental_state": environmental_state,
+        "heart_rate": heart_rate,
+        "hrv_rmssd": hrv_rmssd
     }
 
+def generate_signal_batch(n, start=None, rate_hz=1.0, rng=None):
+    """
+    Generates n simulated readings at a fixed sampling rate as one NumPy structured array.
+    Same value ranges as get_current_signal(), without per-row uuid4/isoformat cost.
+
+    Parameters:
+        n (int): Number of readings
+        start (datetime | str | None): Timestamp of the first reading, defaults to now (UTC)
+        rate_hz (float): Sampling rate; reading i is at start + i / rate_hz seconds
+        rng (np.random.Generator | None): Random source, defaults to the shared seeded generator
+
+    Returns:
+        np.ndarray: Array of SIGNAL_BATCH_DTYPE records
+    """
+    if rate_hz <= 0:
+        raise ValueError("rate_hz must be positive")
+    if start is None:
+        start = datetime.now(timezone.utc)
+    elif isinstance(start, str):
+        start = datetime.fromisoformat(start)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    start_ns = int(start.timestamp()) * 1_000_000_000 + start.microsecond * 1_000
+
+    batch = np.empty(n, dtype=SIGNAL_BATCH_DTYPE)
+    batch["timestamp_ns"] = start_ns + np.round(np.arange(n) * (1e9 / rate_hz)).astype(np.int64)
+    with _rng_lock:
+        rng = rng if rng is not None else get_signal_rng()
+        batch["skin_conductance"] = np.round(rng.uniform(0.5, 6.0, n), 2)
+        batch["state_code"] = rng.integers(0, len(ENVIRONMENTAL_STATES), n, dtype=np.uint8)
+        id_bytes = rng.integers(0, 256, (n, 16), dtype=np.uint8)
+
+    # Random 128-bit ids stamped with the UUID version 4 / RFC 4122 variant bits
+    id_bytes[:, 6] = (id_bytes[:, 6] & 0x0F) | 0x40
+    id_bytes[:, 8] = (id_bytes[:, 8] & 0x3F) | 0x80
+    batch["signal_id"] = id_bytes.view("V16").reshape(n)
+    return batch
+
+def signal_batch_to_packets(batch):
+    """
+    Converts rows of a generated batch into get_current_signal()-style dicts.
+    Intended for the small slices that get logged or displayed, not whole batches.
+    """
+    packets = []
+    for row in batch:
+        ts_ns = int(row["timestamp_ns"])
+        timestamp = datetime.fromtimestamp(ts_ns // 1_000_000_000, tz=timezone.utc).replace(
+            microsecond=(ts_ns % 1_000_000_000) // 1_000)
+        packets.append({
+            "signal_id": str(uuid.UUID(bytes=bytes(row["signal_id"]))),
+            "timestamp_utc": timestamp.isoformat(),
+            "skin_conductance": round(float(row["skin_conductance"]), 2),
+            "environmental_state": ENVIRONMENTAL_STATES[int(row["state_code"])]
+        })
+    return packets
+
 def format_for_ollama_prompt(signal_data: dict) -> str:
     """
     Builds a structured prompt for Ollama LLM based on signal metrics.
@@ -0,0 +1,204 @@
+"""
+Signal Index — Memory-mapped binary sidecar for time-range queries over the signal log.
+Each signal is stored as a fixed-width 13-byte record (int64 epoch-ns timestamp, float32 EDA,
+uint8 environmental state code) in "<log>.eda.bin", kept sorted by time so a range query is
+two binary searches and returns NumPy views onto the mapped file without copying.
+
+Usage:
+    python -m app.signal_index data/signal_log.jsonl   # rebuild the sidecar from the full log
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from app.utils import ensure_dir, file_lock, is_jsonl_path, load_json
+from app.signal_engine import ENVIRONMENTAL_STATES, SIGNAL_SAMPLE_DTYPE
+from app.sqlite_store import TimeBound, get_store, is_sqlite_path, to_epoch_us
+from app.log_rotation import iter_log_range
+
+SIGNAL_INDEX_DTYPE = SIGNAL_SAMPLE_DTYPE
+
+UNKNOWN_STATE_CODE = 255
+STATE_CODES = {state: code for code, state in enumerate(ENVIRONMENTAL_STATES)}
+_STATE_LOOKUP = np.array(list(ENVIRONMENTAL_STATES) + ["unknown"] * (256 - len(ENVIRONMENTAL_STATES)), dtype=object)
+
+
+def signal_index_path(log_path: str) -> str:
+    return str(Path(log_path).with_suffix(".eda.bin"))
+
+
+def encode_signals(signals: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """
+    Packs signal packets into index records. Packets without a parseable timestamp are skipped.
+    """
+    rows = []
+    for signal in signals:
+        ts_us = to_epoch_us(signal.get("timestamp_utc"))
+        if ts_us is None:
+            continue
+        eda = signal.get("skin_conductance")
+        rows.append((
+            ts_us * 1000,
+            float(eda) if eda is not None else np.nan,
+            STATE_CODES.get(signal.get("environmental_state"), UNKNOWN_STATE_CODE),
+        ))
+    return np.array(rows, dtype=SIGNAL_INDEX_DTYPE)
+
+
+def decode_states(state_codes: np.ndarray) -> np.ndarray:
+    """
+    Maps state codes back to their environmental_state strings (unknown codes become "unknown").
+    """
+    return _STATE_LOOKUP[state_codes]
+
+
+def _write_index(records: np.ndarray, index_path: str) -> None:
+    ensure_dir(os.path.dirname(index_path))
+    tmp_path = f"{index_path}.rebuild"
+    records.tofile(tmp_path)
+    os.replace(tmp_path, index_path)
+
+
+def _trim_torn_tail(index_path: str) -> int:
+    # A write cut short leaves a partial record at the end; drop it so appends stay aligned.
+    # Callers hold the file lock. Returns the remaining size in bytes.
+    size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+    torn = size % SIGNAL_INDEX_DTYPE.itemsize
+    if torn:
+        os.truncate(index_path, size - torn)
+    return size - torn
+
+
+def append_to_signal_index(signals: Iterable[Dict[str, Any]], log_path: str) -> None:
+    """
+    Appends newly logged signals to the sidecar. If they arrive out of time order
+    the sidecar is re-sorted in place from its own binary data.
+    """
+    records = encode_signals(signals)
+    if records.size == 0:
+        return
+    index_path = signal_index_path(log_path)
+    ensure_dir(os.path.dirname(index_path))
+
+    with file_lock(index_path):
+        last_ts = None
+        if _trim_torn_tail(index_path) >= SIGNAL_INDEX_DTYPE.itemsize:
+            with open(index_path, "rb") as f:
+                f.seek(-SIGNAL_INDEX_DTYPE.itemsize, os.SEEK_END)
+                last_ts = int(np.frombuffer(f.read(SIGNAL_INDEX_DTYPE.itemsize), dtype=SIGNAL_INDEX_DTYPE)["timestamp_ns"][0])
+
+        in_order = (last_ts is None or records["timestamp_ns"][0] >= last_ts) and \
+            bool(np.all(np.diff(records["timestamp_ns"]) >= 0))
+        if in_order:
+            with open(index_path, "ab") as f:
+                f.write(records.tobytes())
+            return
+
+        existing = np.fromfile(index_path, dtype=SIGNAL_INDEX_DTYPE) if last_ts is not None else \
+            np.empty(0, dtype=SIGNAL_INDEX_DTYPE)
+        merged = np.concatenate([existing, records])
+        _write_index(merged[np.argsort(merged["timestamp_ns"], kind="stable")], index_path)
+
+
+def prune_signal_index(log_path: str, before_us: int) -> int:
+    """
+    Drops sidecar records older than before_us (epoch microseconds), e.g. after log retention
+    deleted the segments holding them. Returns the number of records removed.
+    """
+    index_path = signal_index_path(log_path)
+    if not os.path.exists(index_path):
+        return 0
+    with file_lock(index_path):
+        _trim_torn_tail(index_path)
+        records = np.fromfile(index_path, dtype=SIGNAL_INDEX_DTYPE)
+        cut = int(np.searchsorted(records["timestamp_ns"], before_us * 1000, side="left"))
+        if cut:
+            _write_index(records[cut:], index_path)
+    return cut
+
+
+def build_signal_index(log_path: str) -> int:
+    """
+    Rebuilds the sidecar from every signal in the log (closed segments included).
+    Returns the number of indexed signals.
+    """
+    if is_sqlite_path(log_path):
+        signals = get_store(log_path).iter_signals()
+    elif is_jsonl_path(log_path):
+        signals = iter_log_range(log_path)
+    else:
+        signals = load_json(log_path, default=[])  # Legacy JSON array log
+        signals = signals if isinstance(signals, list) else []
+    records = encode_signals(signals)
+    records = records[np.argsort(records["timestamp_ns"], kind="stable")]
+    index_path = signal_index_path(log_path)
+    with file_lock(index_path):
+        _write_index(records, index_path)
+    return int(records.size)
+
+
+class SignalIndex:
+    """
+    Read-only, memory-mapped view of a signal sidecar. The mapping is refreshed
+    automatically when the file has changed since the last query.
+    """
+
+    def __init__(self, log_path: str):
+        self.index_path = signal_index_path(log_path)
+        self._records: Optional[np.ndarray] = None
+        self._mapped_key = None
+
+    @property
+    def records(self) -> np.ndarray:
+        try:
+            stat = os.stat(self.index_path)
+            size, mtime = stat.st_size, stat.st_mtime_ns
+        except FileNotFoundError:
+            size, mtime = 0, 0
+        usable = size - size % SIGNAL_INDEX_DTYPE.itemsize
+        if (usable, mtime) != self._mapped_key:
+            if usable == 0:
+                self._records = np.empty(0, dtype=SIGNAL_INDEX_DTYPE)
+            else:
+                self._records = np.memmap(self.index_path, dtype=SIGNAL_INDEX_DTYPE, mode="r",
+                                          shape=(usable // SIGNAL_INDEX_DTYPE.itemsize,))
+            self._mapped_key = (usable, mtime)
+        return self._records
+
+    def __len__(self) -> int:
+        return int(self.records.shape[0])
+
+    def range(self, start: TimeBound = None, end: TimeBound = None) -> np.ndarray:
+        """
+        Returns the records with start <= timestamp < end as a view onto the mapped file.
+        """
+        records = self.records
+        timestamps = records["timestamp_ns"]
+        start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+        lo = 0 if start_us is None else int(np.searchsorted(timestamps, start_us * 1000, side="left"))
+        hi = len(records) if end_us is None else int(np.searchsorted(timestamps, end_us * 1000, side="left"))
+        return records[lo:max(lo, hi)]
+
+    def eda_between(self, start: TimeBound = None, end: TimeBound = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns (timestamp_ns, skin_conductance, state_code) column views for a time window.
+        """
+        window = self.range(start, end)
+        return window["timestamp_ns"], window["skin_conductance"], window["state_code"]
+
+
+def main(argv=None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    log_path = args[0] if args else os.getenv("SIGNAL_LOG_PATH", "data/signal_log.jsonl")
+    count = build_signal_index(log_path)
+    print(f"✅ Indexed {count} signals → {signal_index_path(log_path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""
+Signal Ingest — Streams recorded EDA/HR data from files in bounded-memory chunks.
+Supports two layouts:
+    "table"     CSV with a header row, e.g. timestamp,skin_conductance[,heart_rate][,environmental_state]
+                Timestamps may be ISO strings or Unix epoch seconds/milliseconds.
+    "wearable"  Common wearable export (e.g. Empatica E4 EDA.csv / HR.csv): first row is the
+                Unix start time, second row the sample rate in Hz, then one sample per row.
+Chunks are normalised to SIGNAL_SAMPLE_DTYPE arrays, and can be windowed into signal packets
+for match_signal_to_profile and the signal log.
+"""
+
+import csv
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.signal_engine import ENVIRONMENTAL_STATES, SIGNAL_SAMPLE_DTYPE
+from app.matcher import match_signal_to_profile
+from app.biosignals import DEFAULT_MAX_GAP_FACTOR, aligned_to_packets
+from app.signal_quality import clean_chunk, detect_gaps, median_rate_hz, window_quality
+from app.utils_data import append_signal_log
+
+TIMESTAMP_COLUMNS = ("timestamp_utc", "timestamp", "time", "datetime", "unix_timestamp")
+EDA_COLUMNS = ("skin_conductance", "eda", "gsr", "eda_us")
+HR_COLUMNS = ("heart_rate", "hr", "bpm")
+STATE_COLUMNS = ("environmental_state", "state")
+
+NEUTRAL_STATE_CODE = ENVIRONMENTAL_STATES.index("neutral")
+STATE_CODES = {state: code for code, state in enumerate(ENVIRONMENTAL_STATES)}
+
+# Namespace for deterministic packet ids, so re-ingesting a file yields the same signal_ids
+INGEST_NAMESPACE = uuid.UUID("5f1c3a52-6c1e-4d8e-9a57-2f0b1e7d4c11")
+
+
+def detect_layout(path: str) -> str:
+    """
+    Returns "wearable" when the first two rows are single numbers (start time, sample rate), else "table".
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        first_rows = [row for _, row in zip(range(2), csv.reader(f))]
+    if len(first_rows) == 2:
+        try:
+            float(first_rows[0][0])
+            float(first_rows[1][0])
+            return "wearable"
+        except (ValueError, IndexError):
+            pass
+    return "table"
+
+
+def _find_column(header: List[str], candidates) -> Optional[int]:
+    lowered = [h.strip().lower() for h in header]
+    for name in candidates:
+        if name in lowered:
+            return lowered.index(name)
+    return None
+
+
+def _epoch_to_ns(values: np.ndarray) -> np.ndarray:
+    # Infer the unit from magnitude: seconds (~1e9), milliseconds (~1e12), microseconds (~1e15)
+    scale = np.where(values > 1e14, 1e3, np.where(values > 1e11, 1e6, 1e9))
+    return np.round(values * scale).astype(np.int64)
+
+
+def _parse_timestamps(raw: List[str]) -> np.ndarray:
+    try:
+        return _epoch_to_ns(np.array(raw, dtype=np.float64))
+    except ValueError:
+        parsed = np.empty(len(raw), dtype=np.int64)
+        for i, value in enumerate(raw):
+            dt = datetime.fromisoformat(value.strip())
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            parsed[i] = int(dt.timestamp()) * 1_000_000_000 + dt.microsecond * 1_000
+        return parsed
+
+
+def _iter_table(path: str, chunk_size: int) -> Iterator[Dict[str, np.ndarray]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        ts_col = _find_column(header, TIMESTAMP_COLUMNS)
+        eda_col = _find_column(header, EDA_COLUMNS)
+        hr_col = _find_column(header, HR_COLUMNS)
+        state_col = _find_column(header, STATE_COLUMNS)
+        if ts_col is None or eda_col is None:
+            raise ValueError(f"{path}: need a timestamp column and an EDA column, found {header}")
+
+        rows: List[List[str]] = []
+        for row in reader:
+            if not row:
+                continue
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield _table_chunk(rows, ts_col, eda_col, hr_col, state_col)
+                rows = []
+        if rows:
+            yield _table_chunk(rows, ts_col, eda_col, hr_col, state_col)
+
+
+def _parse_values(raw) -> np.ndarray:
+    # Empty cells (dropped samples) become NaN instead of failing the whole chunk
+    return np.array([v.strip() or "nan" for v in raw], dtype=np.float32)
+
+
+def _table_chunk(rows, ts_col, eda_col, hr_col, state_col) -> Dict[str, np.ndarray]:
+    columns = list(zip(*rows))
+    chunk = {
+        "timestamp_ns": _parse_timestamps(list(columns[ts_col])),
+        "skin_conductance": _parse_values(columns[eda_col]),
+    }
+    if hr_col is not None:
+        chunk["heart_rate"] = _parse_values(columns[hr_col])
+    if state_col is not None:
+        chunk["state_code"] = np.array([STATE_CODES.get(v.strip(), NEUTRAL_STATE_CODE) for v in columns[state_col]],
+                                       dtype=np.uint8)
+    return chunk
+
+
+def _iter_wearable(path: str, chunk_size: int, channel: str) -> Iterator[Dict[str, np.ndarray]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        start_s = float(next(reader)[0])
+        rate_hz = float(next(reader)[0])
+        if rate_hz <= 0:
+            raise ValueError(f"{path}: invalid sample rate {rate_hz}")
+        start_ns = int(round(start_s * 1e9))
+        sample_index = 0
+
+        values: List[str] = []
+        for row in reader:
+            # Samples are positional: an empty row is a dropped sample, not a row to skip
+            values.append(row[0] if row else "")
+            if len(values) >= chunk_size:
+                yield _wearable_chunk(values, start_ns, rate_hz, sample_index, channel)
+                sample_index += len(values)
+                values = []
+        if values:
+            yield _wearable_chunk(values, start_ns, rate_hz, sample_index, channel)
+
+
+def _wearable_chunk(values, start_ns, rate_hz, sample_index, channel) -> Dict[str, np.ndarray]:
+    offsets = sample_index + np.arange(len(values))
+    return {
+        "timestamp_ns": start_ns + np.round(offsets * (1e9 / rate_hz)).astype(np.int64),
+        channel: _parse_values(values),
+    }
+
+
+def iter_recording(path: str, chunk_size: int = 65_536, layout: Optional[str] = None,
+                   channel: str = "skin_conductance") -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Streams a recording as column dicts of at most chunk_size samples.
+    Parameters:
+        path (str): CSV file to read
+        chunk_size (int): Maximum samples held in memory at once
+        layout (str): "table" or "wearable"; detected from the file when omitted
+        channel (str): Column name for single-channel wearable exports ("skin_conductance" or "heart_rate")
+    Yields:
+        Dict[str, np.ndarray]: "timestamp_ns" plus whichever of skin_conductance, heart_rate, state_code the file has
+    """
+    layout = layout or detect_layout(path)
+    if layout == "wearable":
+        yield from _iter_wearable(path, chunk_size, channel)
+    elif layout == "table":
+        yield from _iter_table(path, chunk_size)
+    else:
+        raise ValueError(f"Unknown layout: {layout}")
+
+
+def to_samples(chunk: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Converts an ingested chunk to a SIGNAL_SAMPLE_DTYPE array (state defaults to "neutral",
+    EDA to NaN for chunks without it, e.g. HR-only exports).
+    """
+    samples = np.empty(len(chunk["timestamp_ns"]), dtype=SIGNAL_SAMPLE_DTYPE)
+    samples["timestamp_ns"] = chunk["timestamp_ns"]
+    samples["skin_conductance"] = chunk.get("skin_conductance", np.nan)
+    samples["state_code"] = chunk.get("state_code", NEUTRAL_STATE_CODE)
+    return samples
+
+
+def window_packets(chunk: Dict[str, np.ndarray], window_s: float, source: str,
+                   expected_rate_hz: Optional[float] = None,
+                   max_gap_s: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Aggregates a chunk into one signal packet per window (mean EDA/HR, most frequent state).
+    The chunk is first resampled by signal_quality.clean_chunk() onto a grid at expected_rate_hz
+    (default: the chunk's median sampling rate), so jittery timestamps are evened out and grid
+    points inside gaps longer than max_gap_s are left out of the means.
+    EDA and HR are both optional; a packet omits a channel with no valid samples in its window.
+    Windows are aligned to the epoch; ingest_recording() keeps each window within one chunk.
+    Each packet carries data_quality from signal_quality.window_quality(); empty cells are
+    dropped samples and count against it.
+    """
+    timestamps = chunk["timestamp_ns"]
+    if len(timestamps) == 0:
+        return []
+    window_ns = int(window_s * 1e9)
+    first_key = int(timestamps.min()) // window_ns
+    n_windows = int(timestamps.max()) // window_ns - first_key + 1
+    start_ns, end_ns = first_key * window_ns, (first_key + n_windows) * window_ns
+    rows = np.bincount(timestamps // window_ns - first_key, minlength=n_windows)
+    received = _received_timestamps(chunk)
+    counts = np.bincount(received // window_ns - first_key, minlength=n_windows)
+
+    if expected_rate_hz is None:
+        expected_rate_hz = median_rate_hz(timestamps)
+    if expected_rate_hz:
+        quality = window_quality(received, window_s, expected_rate_hz, start_ns, end_ns)
+        cleaned = clean_chunk(chunk, 1.0 / expected_rate_hz, start_ns, end_ns, max_gap_s)
+    else:
+        # A single sample: nothing to resample, and no rate to judge completeness against
+        quality = np.ones(n_windows)
+        cleaned = {"timestamp_ns": timestamps}
+        for name, values in chunk.items():
+            if name != "timestamp_ns":
+                cleaned[name] = values
+                cleaned[f"{name}_valid"] = ~np.isnan(values) if values.dtype.kind == "f" else np.ones(len(values), bool)
+    grid_keys = cleaned["timestamp_ns"] // window_ns - first_key
+
+    means = {channel: _window_means(cleaned[channel], cleaned[f"{channel}_valid"], grid_keys, n_windows)
+             for channel in ("skin_conductance", "heart_rate") if channel in cleaned}
+    state_codes = np.full(n_windows, NEUTRAL_STATE_CODE)
+    if "state_code" in cleaned:
+        valid = cleaned["state_code_valid"]
+        codes = cleaned["state_code"][valid].astype(np.int64)
+        histogram = np.bincount(grid_keys[valid] * len(ENVIRONMENTAL_STATES) + codes,
+                                minlength=n_windows * len(ENVIRONMENTAL_STATES)).reshape(n_windows, -1)
+        state_codes = np.where(histogram.any(axis=1), histogram.argmax(axis=1), NEUTRAL_STATE_CODE)
+
+    # One row per window that has samples, turned into packets the same way aligned grids are
+    windows = np.flatnonzero(rows)
+    windowed = {"timestamp_ns": start_ns + windows * window_ns,
+                "state_code": state_codes[windows], "state_code_valid": np.ones(len(windows), dtype=bool)}
+    for channel, values in means.items():
+        windowed[channel] = values[windows]
+        windowed[f"{channel}_valid"] = ~np.isnan(values[windows])
+
+    packets = []
+    for i, row in zip(windows, aligned_to_packets(windowed)):
+        window_start_ns = start_ns + int(i) * window_ns
+        packets.append({
+            "signal_id": str(uuid.uuid5(INGEST_NAMESPACE, f"{source}:{window_start_ns}")),
+            **row,
+            "sample_count": int(counts[i]),
+            "data_quality": round(float(quality[i]), 3),
+            "source": source,
+        })
+    return packets
+
+
+def _received_timestamps(chunk: Dict[str, np.ndarray]) -> np.ndarray:
+    # Timestamps of samples with at least one measured value; empty cells are dropouts
+    measured = [~np.isnan(chunk[name]) for name in ("skin_conductance", "heart_rate") if name in chunk]
+    if not measured:
+        return chunk["timestamp_ns"]
+    return chunk["timestamp_ns"][np.logical_or.reduce(measured)]
+
+
+def _window_means(values: np.ndarray, valid: np.ndarray, keys: np.ndarray, n_windows: int) -> np.ndarray:
+    # Per-window mean over valid samples; NaN for windows without any
+    valid_counts = np.bincount(keys[valid], minlength=n_windows)
+    sums = np.bincount(keys[valid], weights=values[valid].astype(np.float64), minlength=n_windows)
+    return np.where(valid_counts > 0, sums / np.maximum(valid_counts, 1), np.nan)
+
+
+def _complete_windows(chunks: Iterator[Dict[str, np.ndarray]], window_ns: int) -> Iterator[Dict[str, np.ndarray]]:
+    # Holds back the samples of each chunk's last (possibly unfinished) window and prepends
+    # them to the next chunk, so no window is split across two packets.
+    carry: Optional[Dict[str, np.ndarray]] = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = {key: np.concatenate([carry[key], chunk[key]]) for key in chunk if key in carry}
+        keys = chunk["timestamp_ns"] // window_ns
+        done = keys < keys.max()
+        carry = {key: values[~done] for key, values in chunk.items()}
+        if done.any():
+            yield {key: values[done] for key, values in chunk.items()}
+    if carry is not None and len(carry["timestamp_ns"]):
+        yield carry
+
+
+def ingest_recording(path: str, pattern_tags: List[str], signal_log_path: Optional[str] = None,
+                     window_s: float = 60.0, chunk_size: int = 65_536, layout: Optional[str] = None,
+                     min_quality: float = 0.5, channel: str = "skin_conductance",
+                     max_gap_s: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Streams a recording through gap detection, resampling (see app/signal_quality.py), windowing,
+    profile matching and (optionally) the signal log.
+    Parameters:
+        path (str): Recording to ingest
+        pattern_tags (List[str]): Pattern tags to match each packet against
+        signal_log_path (str): Signal log to append packets to, or None to skip logging
+        window_s (float): Seconds of samples aggregated into one packet
+        chunk_size (int): Maximum samples held in memory at once
+        layout (str): "table" or "wearable"; detected when omitted
+        min_quality (float): Windows with a lower data_quality are logged but not matched
+        channel (str): Channel of a single-channel wearable export ("skin_conductance" or "heart_rate")
+        max_gap_s (float): Longest pause between samples that is not a dropout
+            (default: DEFAULT_MAX_GAP_FACTOR sample intervals)
+    Returns:
+        Dict[str, Any]: Sample/packet counts, low-quality windows, dropouts (gaps, gap_s)
+            and per-mismatch tallies
+    """
+    summary = {"source": path, "samples": 0, "packets": 0, "low_quality": 0, "misaligned": 0,
+               "gaps": 0, "gap_s": 0.0, "mismatch_counts": {}}
+    chunks = iter_recording(path, chunk_size=chunk_size, layout=layout, channel=channel)
+    last_ns = None
+    for chunk in _complete_windows(chunks, int(window_s * 1e9)):
+        summary["samples"] += len(chunk["timestamp_ns"])
+        rate_hz = median_rate_hz(chunk["timestamp_ns"])
+        gap_s = max_gap_s if max_gap_s is not None else (DEFAULT_MAX_GAP_FACTOR / rate_hz if rate_hz else None)
+
+        # Dropped samples (empty cells) count towards gaps; the previous chunk's last sample
+        # catches a gap across the chunk boundary
+        present = np.sort(_received_timestamps(chunk))
+        if gap_s is not None and len(present):
+            gaps = detect_gaps(present if last_ns is None else np.r_[last_ns, present], gap_s)
+            summary["gaps"] += len(gaps)
+            summary["gap_s"] += round(float(gaps["duration_s"].sum()), 3)
+        if len(present):
+            last_ns = int(present[-1])
+
+        for packet in window_packets(chunk, window_s, source=path, expected_rate_hz=rate_hz, max_gap_s=gap_s):
+            if packet["data_quality"] < min_quality:
+                packet["match_status"] = "insufficient_data"
+                summary["low_quality"] += 1
+                if signal_log_path:
+                    append_signal_log(packet, signal_log_path)
+                continue
+            # A channel the window has no samples for must not trigger rules through a default
+            match = match_signal_to_profile(packet, pattern_tags, use_defaults=False)
+            packet["match_status"] = match["status"]
+            summary["packets"] += 1
+            if match["status"] != "aligned":
+                summary["misaligned"] += 1
+                for mismatch in match["mismatches"]:
+                    summary["mismatch_counts"][mismatch] = summary["mismatch_counts"].get(mismatch, 0) + 1
+            if signal_log_path:
+                append_signal_log(packet, signal_log_path)
+    return summary
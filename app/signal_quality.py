@@ -0,0 +1,161 @@
+"""
+Signal Quality — Preprocessing between ingestion and the matcher.
+Detects dropouts, resamples jittery/irregular timestamps onto a fixed grid and reports how
+much of each window actually has data. Everything works on whole arrays; the *_batch variants
+clean many users in one pass over flat, user-sorted arrays instead of looping per user.
+signal_ingest runs every recorded chunk through clean_chunk() before windowing it into packets.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.biosignals import MultiChannelSeries, align_channel, make_grid
+
+GAP_DTYPE = np.dtype([
+    ("start_ns", "<i8"),
+    ("end_ns", "<i8"),
+    ("duration_s", "<f8"),
+])
+
+
+def detect_gaps(timestamps_ns: np.ndarray, max_gap_s: float) -> np.ndarray:
+    """
+    Returns every interval between consecutive samples longer than max_gap_s (GAP_DTYPE).
+    """
+    timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+    if len(timestamps_ns) < 2:
+        return np.empty(0, dtype=GAP_DTYPE)
+    deltas = np.diff(timestamps_ns)
+    idx = np.flatnonzero(deltas > max_gap_s * 1e9)
+    gaps = np.empty(len(idx), dtype=GAP_DTYPE)
+    gaps["start_ns"] = timestamps_ns[idx]
+    gaps["end_ns"] = timestamps_ns[idx + 1]
+    gaps["duration_s"] = deltas[idx] / 1e9
+    return gaps
+
+
+def resample_to_grid(timestamps_ns: np.ndarray, values: np.ndarray, step_s: float,
+                     start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+                     method: str = "linear", max_gap_s: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Resamples an irregular series onto a fixed grid. Grid points inside a gap longer than
+    max_gap_s (default: 3 grid steps) are NaN and marked invalid.
+    Returns {"timestamp_ns", "values", "valid"}.
+    """
+    timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+    if len(timestamps_ns) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return {"timestamp_ns": empty, "values": empty.astype(np.float64), "valid": empty.astype(bool)}
+    start_ns = int(timestamps_ns[0]) if start_ns is None else start_ns
+    end_ns = int(timestamps_ns[-1]) + 1 if end_ns is None else end_ns
+    grid = make_grid(start_ns, end_ns, step_s)
+    gap_ns = int((max_gap_s if max_gap_s is not None else 3 * step_s) * 1e9)
+    resampled, valid = align_channel(timestamps_ns, np.asarray(values), grid, method, gap_ns)
+    return {"timestamp_ns": grid, "values": resampled, "valid": valid}
+
+
+def median_rate_hz(timestamps_ns: np.ndarray) -> Optional[float]:
+    """
+    Nominal sampling rate from the median positive sample interval, or None with fewer than two samples.
+    """
+    intervals = np.diff(np.sort(np.asarray(timestamps_ns, dtype=np.int64)))
+    intervals = intervals[intervals > 0]
+    return 1e9 / float(np.median(intervals)) if len(intervals) else None
+
+
+def clean_chunk(chunk: Dict[str, np.ndarray], step_s: float, start_ns: int, end_ns: int,
+                max_gap_s: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Resamples every channel of an ingested chunk onto one fixed grid over [start_ns, end_ns)
+    through a MultiChannelSeries. NaN samples are dropped first, so dropouts become gaps; grid
+    points inside a gap longer than max_gap_s (default: the series' per-channel tolerance) are
+    NaN and marked invalid.
+    Returns "timestamp_ns" (grid), then "<channel>" values and "<channel>_valid" masks.
+    """
+    timestamps_ns = np.asarray(chunk["timestamp_ns"], dtype=np.int64)
+    series = MultiChannelSeries()
+    for name, values in chunk.items():
+        if name == "timestamp_ns":
+            continue
+        values = np.asarray(values)
+        keep = ~np.isnan(values) if values.dtype.kind == "f" else np.ones(len(values), dtype=bool)
+        series.extend(name, timestamps_ns[keep], values[keep])
+
+    gaps = None if max_gap_s is None else {name: max_gap_s for name in series.channels}
+    cleaned = series.align(step_s, start_ns, end_ns, max_gap_s=gaps)
+    grid = make_grid(start_ns, end_ns, step_s)
+    for name in series.channels:
+        # A chunk with no valid samples at all has no span to align over
+        cleaned.setdefault(name, np.full(len(grid), np.nan))
+        cleaned.setdefault(f"{name}_valid", np.zeros(len(grid), dtype=bool))
+    cleaned["timestamp_ns"] = grid
+    return cleaned
+
+
+def window_quality(timestamps_ns: np.ndarray, window_s: float, expected_rate_hz: float,
+                   start_ns: int, end_ns: int) -> np.ndarray:
+    """
+    Per-window data-quality ratio: samples received / samples expected, capped at 1.0.
+    """
+    window_ns = int(window_s * 1e9)
+    n_windows = max(1, -(-(end_ns - start_ns) // window_ns))
+    timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+    inside = timestamps_ns[(timestamps_ns >= start_ns) & (timestamps_ns < end_ns)]
+    counts = np.bincount((inside - start_ns) // window_ns, minlength=n_windows)
+    return np.minimum(counts / (window_s * expected_rate_hz), 1.0)
+
+
+def resample_batch(user_index: np.ndarray, timestamps_ns: np.ndarray, values: np.ndarray, n_users: int,
+                   start_ns: int, end_ns: int, step_s: float, method: str = "linear",
+                   max_gap_s: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Resamples many users onto the same grid at once.
+    Parameters:
+        user_index (np.ndarray): User number (0..n_users-1) of each sample
+        timestamps_ns (np.ndarray): Sample times; input already sorted by (user, time) skips a sort
+        values (np.ndarray): Sample values
+        n_users (int): Number of users
+        start_ns, end_ns (int): Shared grid range [start, end)
+        step_s (float): Grid spacing in seconds
+        method (str): "linear" or "ffill"
+        max_gap_s (float): Gap tolerance (default: 3 grid steps)
+    Returns:
+        Dict[str, np.ndarray]: "timestamp_ns" (grid) plus "values" and "valid" shaped (n_users, len(grid))
+    """
+    grid = make_grid(start_ns, end_ns, step_s)
+    gap_ns = int((max_gap_s if max_gap_s is not None else 3 * step_s) * 1e9)
+
+    # Lay users end to end on one relative time axis; the spacing exceeds the gap tolerance,
+    # so interpolation and forward fill never bridge two users.
+    stride = (end_ns - start_ns) + 2 * gap_ns + 1
+    user_index = np.asarray(user_index, dtype=np.int64)
+    timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+    keep = (timestamps_ns >= start_ns - gap_ns) & (timestamps_ns < end_ns + gap_ns)
+    shifted = (timestamps_ns[keep] - start_ns) + user_index[keep] * stride
+    shifted_values = np.asarray(values)[keep]
+    if len(shifted) > 1 and np.any(shifted[1:] < shifted[:-1]):
+        order = np.argsort(shifted, kind="stable")
+        shifted, shifted_values = shifted[order], shifted_values[order]
+
+    shifted_grid = ((grid - start_ns)[None, :] + (np.arange(n_users, dtype=np.int64) * stride)[:, None]).ravel()
+    resampled, valid = align_channel(shifted, shifted_values, shifted_grid, method, gap_ns)
+    return {
+        "timestamp_ns": grid,
+        "values": resampled.reshape(n_users, len(grid)),
+        "valid": valid.reshape(n_users, len(grid)),
+    }
+
+
+def quality_batch(user_index: np.ndarray, timestamps_ns: np.ndarray, n_users: int, start_ns: int, end_ns: int,
+                  window_s: float, expected_rate_hz: float) -> np.ndarray:
+    """
+    Per-user, per-window data-quality ratios, shaped (n_users, n_windows).
+    """
+    window_ns = int(window_s * 1e9)
+    n_windows = max(1, -(-(end_ns - start_ns) // window_ns))
+    timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+    inside = (timestamps_ns >= start_ns) & (timestamps_ns < end_ns)
+    keys = np.asarray(user_index, dtype=np.int64)[inside] * n_windows + (timestamps_ns[inside] - start_ns) // window_ns
+    counts = np.bincount(keys, minlength=n_users * n_windows).reshape(n_users, n_windows)
+    return np.minimum(counts / (window_s * expected_rate_hz), 1.0)
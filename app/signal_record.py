@@ -0,0 +1,194 @@
+# 🧾 Gemma Guard — Typed Signal Record
+# Immutable, slot-based form of a signal packet for holding large histories in memory.
+# Timestamps are int64 epoch nanoseconds, UUID ids are 128-bit ints and the environmental state is
+# an IntEnum whose values are the same state codes used by the binary signal index. Legacy ids
+# (e.g. "sig-20250804-0032") and non-canonical timestamp text are kept as given, so
+# from_dict()/to_dict() round-trip any logged packet unchanged.
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from app.signal_engine import ENVIRONMENTAL_STATES
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_CORE_KEYS = ("signal_id", "timestamp_utc", "skin_conductance", "environmental_state")
+
+
+class EnvironmentalState(IntEnum):
+    EXPANSIVE = 0
+    RESTRICTIVE = 1
+    NEUTRAL = 2
+    CHARGED = 3
+
+    @property
+    def label(self) -> str:
+        return ENVIRONMENTAL_STATES[self.value]
+
+    @classmethod
+    def from_label(cls, label: str) -> "EnvironmentalState":
+        try:
+            return cls(ENVIRONMENTAL_STATES.index(label))
+        except ValueError:
+            raise ValueError(f"Unknown environmental_state: {label!r}") from None
+
+    def __str__(self) -> str:
+        return self.label
+
+
+def iso_to_ns(timestamp: str) -> int:
+    """
+    Parses an ISO-8601 timestamp to epoch nanoseconds (naive values are taken as UTC).
+    """
+    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1) * 1_000
+
+
+def ns_to_iso(timestamp_ns: int) -> str:
+    """
+    Formats epoch nanoseconds the way get_current_signal() does (UTC, microsecond precision).
+    """
+    return (_EPOCH + timedelta(microseconds=timestamp_ns // 1_000)).isoformat()
+
+
+class SignalRecord:
+    """
+    Frozen signal packet. Reads like the packet dict through get()/[] so it can be passed
+    straight to the matcher and prompt formatting; to_dict() gives back the JSON shape.
+    Keys beyond the four core fields (e.g. heart_rate, source) are kept in `extras`.
+    signal_id is an int for canonical UUIDs and the original string otherwise; timestamp_text
+    holds the original timestamp only when ns_to_iso() would format it differently.
+    """
+
+    __slots__ = ("signal_id", "timestamp_ns", "skin_conductance", "environmental_state", "extras",
+                 "timestamp_text")
+
+    def __init__(self, signal_id: Union[int, str, None], timestamp_ns: int, skin_conductance: Optional[float],
+                 environmental_state: Union[EnvironmentalState, int],
+                 extras: Tuple[Tuple[str, Any], ...] = (), timestamp_text: Optional[str] = None):
+        setter = object.__setattr__
+        setter(self, "signal_id", signal_id)
+        setter(self, "timestamp_ns", int(timestamp_ns))
+        setter(self, "skin_conductance", None if skin_conductance is None else float(skin_conductance))
+        setter(self, "environmental_state", EnvironmentalState(environmental_state))
+        setter(self, "extras", tuple(extras))
+        setter(self, "timestamp_text", timestamp_text)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SignalRecord is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("SignalRecord is immutable")
+
+    def _key(self):
+        return (self.signal_id, self.timestamp_ns, self.skin_conductance, self.environmental_state,
+                self.timestamp_text)
+
+    def __eq__(self, other):
+        if not isinstance(other, SignalRecord):
+            return NotImplemented
+        return self._key() == other._key() and self.extras == other.extras
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return (f"SignalRecord(signal_id={self.signal_uuid}, timestamp_utc={self.timestamp_utc}, "
+                f"skin_conductance={self.skin_conductance}, environmental_state={self.environmental_state.label})")
+
+    def __reduce__(self):
+        return (SignalRecord, (self.signal_id, self.timestamp_ns, self.skin_conductance,
+                               int(self.environmental_state), self.extras, self.timestamp_text))
+
+    @property
+    def signal_uuid(self) -> Optional[str]:
+        if self.signal_id is None or isinstance(self.signal_id, str):
+            return self.signal_id
+        return str(uuid.UUID(int=self.signal_id))
+
+    @property
+    def timestamp_utc(self) -> str:
+        return self.timestamp_text if self.timestamp_text is not None else ns_to_iso(self.timestamp_ns)
+
+    # --- Read-only mapping interface over the dict shape
+    def __getitem__(self, key: str) -> Any:
+        if key == "signal_id":
+            return self.signal_uuid
+        if key == "timestamp_utc":
+            return self.timestamp_utc
+        if key == "skin_conductance":
+            return self.skin_conductance
+        if key == "environmental_state":
+            return self.environmental_state.label
+        for extra_key, value in self.extras:
+            if extra_key == key:
+                return value
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterator[str]:
+        yield from _CORE_KEYS
+        for key, _ in self.extras:
+            yield key
+
+    def to_dict(self) -> Dict[str, Any]:
+        packet = {key: self[key] for key in _CORE_KEYS}
+        packet.update(self.extras)
+        return packet
+
+    @classmethod
+    def from_dict(cls, packet: Mapping[str, Any]) -> "SignalRecord":
+        """
+        Builds a record from a get_current_signal()-style dict.
+        Raises ValueError for an unknown environmental_state.
+        """
+        timestamp = packet["timestamp_utc"]
+        timestamp_ns = iso_to_ns(timestamp)
+        return cls(
+            signal_id=_pack_signal_id(packet.get("signal_id")),
+            timestamp_ns=timestamp_ns,
+            skin_conductance=packet.get("skin_conductance"),
+            environmental_state=EnvironmentalState.from_label(packet.get("environmental_state", "neutral")),
+            extras=tuple((k, v) for k, v in packet.items() if k not in _CORE_KEYS),
+            timestamp_text=None if ns_to_iso(timestamp_ns) == timestamp else timestamp,
+        )
+
+    @classmethod
+    def from_batch_row(cls, row: np.void) -> "SignalRecord":
+        """
+        Builds a record from one row of signal_engine.generate_signal_batch().
+        """
+        return cls(
+            signal_id=int.from_bytes(bytes(row["signal_id"]), "big"),
+            timestamp_ns=int(row["timestamp_ns"]),
+            skin_conductance=round(float(row["skin_conductance"]), 2),
+            environmental_state=int(row["state_code"]),
+        )
+
+
+def _pack_signal_id(signal_id: Any) -> Union[int, str, None]:
+    # Canonical UUID strings are stored as 128-bit ints; anything else is kept verbatim
+    if signal_id is None:
+        return None
+    try:
+        packed = uuid.UUID(str(signal_id))
+    except ValueError:
+        return signal_id
+    return packed.int if str(packed) == signal_id else signal_id
+
+
+def as_signal_dict(signal: Union[SignalRecord, Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Returns a mutable dict copy of a signal given as either a SignalRecord or a packet dict.
+    """
+    return signal.to_dict() if isinstance(signal, SignalRecord) else dict(signal)
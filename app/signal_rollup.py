@@ -0,0 +1,217 @@
+"""
+Signal Rollups — Incremental per-minute, per-hour and per-day aggregates of the signal log.
+Each tier keeps count, EDA count/sum/min/max and an environmental_state histogram per bucket,
+so long-range trend queries read a few hundred rollup rows instead of every raw packet.
+
+Layout under "<log>.rollups/":
+    open.json       Buckets still receiving signals, one per tier
+    minute.jsonl    Closed per-minute buckets (pruned after ROLLUP_MINUTE_RETENTION_DAYS, default 7)
+    hour.jsonl      Closed per-hour buckets (pruned after ROLLUP_HOUR_RETENTION_DAYS, default 365)
+    day.jsonl       Closed per-day buckets (kept indefinitely)
+Minute buckets are also dropped once log retention deletes the signals behind them; hour and
+day buckets keep trends available for data older than the raw log.
+
+A signal that arrives after its bucket was closed is written as an extra partial row;
+readers merge rows that share a bucket_start.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.utils import append_jsonl_many, atomic_write_text, file_lock, iter_jsonl, load_json
+from app.sqlite_store import TimeBound, to_epoch_us
+from app.log_rotation import record_time_us
+
+ROLLUP_TIERS = {"minute": 60, "hour": 3_600, "day": 86_400}
+
+
+def _retention_days(tier: str) -> float:
+    defaults = {"minute": "7", "hour": "365", "day": "0"}
+    return float(os.getenv(f"ROLLUP_{tier.upper()}_RETENTION_DAYS", defaults[tier]))
+
+
+def rollup_dir(log_path: str) -> str:
+    return str(Path(log_path).with_suffix(".rollups"))
+
+
+def _new_bucket(bucket_start: int) -> Dict[str, Any]:
+    return {
+        "bucket_start": bucket_start,
+        "bucket_start_utc": datetime.fromtimestamp(bucket_start, tz=timezone.utc).isoformat(),
+        "count": 0,
+        "eda_count": 0,
+        "sum": 0.0,
+        "min": None,
+        "max": None,
+        "states": {},
+    }
+
+
+def _add_sample(bucket: Dict[str, Any], eda: Optional[float], state: Optional[str]) -> None:
+    bucket["count"] += 1
+    if eda is not None:
+        bucket["eda_count"] += 1
+        bucket["sum"] += eda
+        bucket["min"] = eda if bucket["min"] is None else min(bucket["min"], eda)
+        bucket["max"] = eda if bucket["max"] is None else max(bucket["max"], eda)
+    key = state or "unknown"
+    bucket["states"][key] = bucket["states"].get(key, 0) + 1
+
+
+def _eda_count(bucket: Dict[str, Any]) -> int:
+    # Rows written before eda_count existed counted every sample towards the mean
+    return bucket.get("eda_count", bucket["count"])
+
+
+def merge_buckets(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combines two partial rows for the same bucket.
+    """
+    merged = _new_bucket(a["bucket_start"])
+    merged["count"] = a["count"] + b["count"]
+    merged["eda_count"] = _eda_count(a) + _eda_count(b)
+    merged["sum"] = a["sum"] + b["sum"]
+    mins = [v for v in (a["min"], b["min"]) if v is not None]
+    maxs = [v for v in (a["max"], b["max"]) if v is not None]
+    merged["min"] = min(mins) if mins else None
+    merged["max"] = max(maxs) if maxs else None
+    for states in (a["states"], b["states"]):
+        for state, count in states.items():
+            merged["states"][state] = merged["states"].get(state, 0) + count
+    return merged
+
+
+def update_rollups(signals: Iterable[Dict[str, Any]], log_path: str) -> None:
+    """
+    Folds newly logged signals into every tier. Cost is proportional to the batch, not the log.
+    """
+    samples = []
+    for signal in signals:
+        ts_us = record_time_us(signal)
+        if ts_us is None:
+            continue
+        eda = signal.get("skin_conductance")
+        samples.append((ts_us // 1_000_000, float(eda) if eda is not None else None, signal.get("environmental_state")))
+    if not samples:
+        return
+
+    directory = rollup_dir(log_path)
+    open_path = os.path.join(directory, "open.json")
+    with file_lock(open_path):
+        open_buckets = load_json(open_path, default={})
+        closed: Dict[str, List[Dict[str, Any]]] = {tier: [] for tier in ROLLUP_TIERS}
+        late: Dict[str, Dict[int, Dict[str, Any]]] = {tier: {} for tier in ROLLUP_TIERS}
+
+        for ts, eda, state in samples:
+            for tier, width in ROLLUP_TIERS.items():
+                start = ts - ts % width
+                current = open_buckets.get(tier)
+                if current is None or start > current["bucket_start"]:
+                    if current is not None:
+                        closed[tier].append(current)
+                    current = _new_bucket(start)
+                    open_buckets[tier] = current
+                if start == current["bucket_start"]:
+                    _add_sample(current, eda, state)
+                else:
+                    # Bucket already closed: record a partial row to be merged on read
+                    partial = late[tier].setdefault(start, _new_bucket(start))
+                    _add_sample(partial, eda, state)
+
+        for tier in ROLLUP_TIERS:
+            rows = closed[tier] + list(late[tier].values())
+            if rows:
+                append_jsonl_many(rows, os.path.join(directory, f"{tier}.jsonl"))
+        atomic_write_text(json.dumps(open_buckets, ensure_ascii=False), open_path)
+
+        if closed["day"]:
+            _prune(directory, open_buckets["day"]["bucket_start"])
+
+
+def _prune(directory: str, now: int) -> None:
+    for tier in ROLLUP_TIERS:
+        days = _retention_days(tier)
+        tier_path = os.path.join(directory, f"{tier}.jsonl")
+        if not days or not os.path.exists(tier_path):
+            continue
+        cutoff = now - days * 86_400
+        with file_lock(tier_path):
+            rows = list(iter_jsonl(tier_path))
+            kept = [row for row in rows if row["bucket_start"] >= cutoff]
+            if len(kept) != len(rows):
+                atomic_write_text("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in kept), tier_path)
+
+
+def prune_rollups(log_path: str, before_us: int, tiers: Iterable[str] = ("minute",)) -> None:
+    """
+    Drops closed buckets that end before before_us (epoch microseconds) from the given tiers.
+    """
+    directory = rollup_dir(log_path)
+    before_s = before_us // 1_000_000
+    for tier in tiers:
+        tier_path = os.path.join(directory, f"{tier}.jsonl")
+        if not os.path.exists(tier_path):
+            continue
+        with file_lock(tier_path):
+            rows = list(iter_jsonl(tier_path))
+            kept = [row for row in rows if row["bucket_start"] + ROLLUP_TIERS[tier] > before_s]
+            if len(kept) != len(rows):
+                atomic_write_text("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in kept), tier_path)
+
+
+def read_rollups(log_path: str, tier: str, start: TimeBound = None, end: TimeBound = None) -> List[Dict[str, Any]]:
+    """
+    Returns merged buckets of one tier with start <= bucket_start < end, oldest first,
+    including the bucket that is still open. Each bucket carries a computed "mean".
+    """
+    if tier not in ROLLUP_TIERS:
+        raise ValueError(f"Unknown rollup tier: {tier}")
+    start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+    lo = None if start_us is None else start_us // 1_000_000
+    hi = None if end_us is None else end_us // 1_000_000
+
+    directory = rollup_dir(log_path)
+    rows = list(iter_jsonl(os.path.join(directory, f"{tier}.jsonl")))
+    current = load_json(os.path.join(directory, "open.json"), default={}).get(tier)
+    if current:
+        rows.append(current)
+
+    buckets: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        key = row["bucket_start"]
+        if (lo is not None and key < lo - lo % ROLLUP_TIERS[tier]) or (hi is not None and key >= hi):
+            continue
+        buckets[key] = merge_buckets(buckets[key], row) if key in buckets else row
+
+    result = []
+    for key in sorted(buckets):
+        bucket = dict(buckets[key])
+        eda_count = _eda_count(bucket)
+        bucket["mean"] = bucket["sum"] / eda_count if eda_count else None
+        result.append(bucket)
+    return result
+
+
+def choose_tier(start: TimeBound, end: TimeBound, max_points: int = 500) -> str:
+    """
+    Picks the finest tier that covers the window in at most max_points buckets.
+    """
+    start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+    if start_us is None or end_us is None:
+        return "day"
+    span = max(0, end_us - start_us) / 1_000_000
+    for tier, width in ROLLUP_TIERS.items():
+        if span / width <= max_points:
+            return tier
+    return "day"
+
+
+def signal_trend(log_path: str, start: TimeBound, end: TimeBound, max_points: int = 500) -> Dict[str, Any]:
+    """
+    Returns {"tier": ..., "buckets": [...]} for a window, at the finest resolution within max_points.
+    """
+    tier = choose_tier(start, end, max_points)
+    return {"tier": tier, "buckets": read_rollups(log_path, tier, start, end)}
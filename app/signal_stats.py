@@ -0,0 +1,175 @@
+"""
+Signal Stats — Streaming skin conductance statistics with O(1) work per sample.
+For each user and each window length (1 min / 15 min / 1 h by default) it keeps:
+    EWMA                 time-aware exponential average with the window as time constant
+    mean / variance      sliding Welford (samples are added and removed incrementally)
+    min / max            monotonic deques
+    percentiles          fixed-bin histogram with add/remove, accurate to one bin width
+so smoothed features can be read on every refresh without touching the history.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.sqlite_store import to_epoch_us
+
+DEFAULT_WINDOWS = {"1m": 60, "15m": 900, "1h": 3_600}
+
+# Percentile histogram range in µS; values outside are clamped into the edge bins
+HISTOGRAM_RANGE = (0.0, 20.0)
+HISTOGRAM_BINS = 400
+
+
+class RollingWindow:
+    """
+    Statistics over the samples whose timestamps fall within the last `seconds`.
+    Samples must arrive in non-decreasing time order.
+    """
+
+    def __init__(self, seconds: float):
+        self.window_ns = int(seconds * 1e9)
+        self.tau_s = float(seconds)
+        self._samples = deque()  # (timestamp_ns, value)
+        self._min = deque()      # increasing values
+        self._max = deque()      # decreasing values
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._ewma: Optional[float] = None
+        self._last_ns: Optional[int] = None
+        lo, hi = HISTOGRAM_RANGE
+        self._bin_width = (hi - lo) / HISTOGRAM_BINS
+        self._histogram = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+
+    def _bin(self, value: float) -> int:
+        return min(HISTOGRAM_BINS - 1, max(0, int((value - HISTOGRAM_RANGE[0]) / self._bin_width)))
+
+    def update(self, timestamp_ns: int, value: float) -> None:
+        if self._ewma is None:
+            self._ewma = value
+        else:
+            dt = max(0, timestamp_ns - self._last_ns) / 1e9
+            alpha = 1.0 - math.exp(-dt / self.tau_s)
+            self._ewma += alpha * (value - self._ewma)
+        self._last_ns = timestamp_ns
+
+        self._samples.append((timestamp_ns, value))
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+        self._histogram[self._bin(value)] += 1
+
+        while self._min and self._min[-1][1] > value:
+            self._min.pop()
+        self._min.append((timestamp_ns, value))
+        while self._max and self._max[-1][1] < value:
+            self._max.pop()
+        self._max.append((timestamp_ns, value))
+
+        self._expire(timestamp_ns - self.window_ns)
+
+    def _expire(self, cutoff_ns: int) -> None:
+        while self._samples and self._samples[0][0] <= cutoff_ns:
+            _, old = self._samples.popleft()
+            self._histogram[self._bin(old)] -= 1
+            self._count -= 1
+            if self._count == 0:
+                self._mean, self._m2 = 0.0, 0.0
+            else:
+                delta = old - self._mean
+                self._mean -= delta / self._count
+                self._m2 = max(0.0, self._m2 - delta * (old - self._mean))
+        while self._min and self._min[0][0] <= cutoff_ns:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= cutoff_ns:
+            self._max.popleft()
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Approximate q-th percentile (0-100), reported at the centre of its histogram bin.
+        """
+        if self._count == 0:
+            return None
+        rank = max(1, math.ceil(q / 100.0 * self._count))
+        index = int(np.searchsorted(np.cumsum(self._histogram), rank))
+        return HISTOGRAM_RANGE[0] + (index + 0.5) * self._bin_width
+
+    def snapshot(self) -> Dict[str, Any]:
+        if self._count == 0:
+            return {"count": 0, "ewma": self._ewma, "mean": None, "std": None, "min": None, "max": None,
+                    "p50": None, "p90": None}
+        variance = self._m2 / (self._count - 1) if self._count > 1 else 0.0
+        return {
+            "count": self._count,
+            "ewma": self._ewma,
+            "mean": self._mean,
+            "std": math.sqrt(variance),
+            "min": self._min[0][1],
+            "max": self._max[0][1],
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+        }
+
+
+class SignalStats:
+    """
+    One user's rolling statistics across several window lengths.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, float]] = None):
+        self.windows = {name: RollingWindow(seconds) for name, seconds in (windows or DEFAULT_WINDOWS).items()}
+        self._lock = threading.Lock()
+
+    def update(self, timestamp_ns: int, skin_conductance: float) -> None:
+        if skin_conductance is None or math.isnan(skin_conductance):
+            return
+        with self._lock:
+            for window in self.windows.values():
+                window.update(timestamp_ns, skin_conductance)
+
+    def update_signal(self, signal: Dict[str, Any]) -> None:
+        """
+        Folds in a signal packet (timestamp_utc, skin_conductance).
+        """
+        ts_us = to_epoch_us(signal.get("timestamp_utc"))
+        eda = signal.get("skin_conductance")
+        if ts_us is not None and eda is not None:
+            self.update(ts_us * 1000, float(eda))
+
+    def update_samples(self, samples: np.ndarray) -> None:
+        """
+        Folds in a SIGNAL_SAMPLE_DTYPE chunk, e.g. from the EDA simulator or file ingest.
+        """
+        for timestamp_ns, value in zip(samples["timestamp_ns"].tolist(), samples["skin_conductance"].tolist()):
+            self.update(timestamp_ns, value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: window.snapshot() for name, window in self.windows.items()}
+
+
+_stats: Dict[str, SignalStats] = {}
+_stats_lock = threading.Lock()
+
+
+def get_signal_stats(user_id: str) -> SignalStats:
+    """
+    Returns the process-wide statistics for a user, creating them on first use.
+    """
+    with _stats_lock:
+        stats = _stats.get(user_id)
+        if stats is None:
+            stats = SignalStats()
+            _stats[user_id] = stats
+        return stats
+
+
+def stats_from_samples(samples: np.ndarray, windows: Optional[Dict[str, float]] = None) -> SignalStats:
+    stats = SignalStats(windows)
+    stats.update_samples(samples)
+    return stats
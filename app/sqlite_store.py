@@ -0,0 +1,253 @@
+"""
+SQLite Log Store — Optional embedded store for signal packets and inference results.
+Enabled by pointing SIGNAL_LOG_PATH / INFERENCE_LOG_PATH at a ".db" or ".sqlite" file.
+Runs in WAL mode so several Streamlit sessions can write concurrently.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from app.utils import ensure_dir
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+TimeBound = Union[str, datetime, None]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    signal_id TEXT,
+    timestamp_utc TEXT,
+    ts_epoch_us INTEGER,
+    skin_conductance REAL,
+    environmental_state TEXT,
+    record_id TEXT,
+    logged_at_utc TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals (ts_epoch_us);
+CREATE INDEX IF NOT EXISTS idx_signals_signal_id ON signals (signal_id);
+
+CREATE TABLE IF NOT EXISTS inferences (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    ts_epoch_us INTEGER,
+    signal_id TEXT,
+    llm_model TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_inferences_ts ON inferences (ts_epoch_us);
+CREATE INDEX IF NOT EXISTS idx_inferences_signal_id ON inferences (signal_id);
+"""
+
+
+def is_sqlite_path(filepath: str) -> bool:
+    """
+    Check whether a log path points to an SQLite database.
+    """
+    return str(filepath).endswith(SQLITE_SUFFIXES)
+
+
+def to_epoch_us(value: TimeBound) -> Optional[int]:
+    """
+    Converts an ISO timestamp or datetime to integer microseconds since the epoch.
+    Naive values are treated as UTC. Returns None for missing or unparseable input.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class SQLiteLogStore:
+    """
+    Indexed store for signal and inference logs.
+    Each thread gets its own connection; all connections share one WAL-mode database file.
+    """
+
+    def __init__(self, db_path: str, busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        ensure_dir(os.path.dirname(db_path))
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """
+        Closes the calling thread's connection, if one is open.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # --- Writes
+
+    def insert_signal(self, signal: Dict[str, Any]) -> None:
+        """
+        Stores one signal packet. The full packet is kept as JSON so extra fields round-trip.
+        """
+        self.insert_signals([signal])
+
+    def insert_signals(self, signals: List[Dict[str, Any]]) -> None:
+        """
+        Stores several signal packets in a single transaction.
+        """
+        rows = [
+            (
+                s.get("signal_id"),
+                s.get("timestamp_utc"),
+                to_epoch_us(s.get("timestamp_utc")),
+                s.get("skin_conductance"),
+                s.get("environmental_state"),
+                s.get("record_id"),
+                s.get("logged_at_utc"),
+                json.dumps(s, ensure_ascii=False),
+            )
+            for s in signals
+        ]
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO signals (signal_id, timestamp_utc, ts_epoch_us, skin_conductance, "
+                "environmental_state, record_id, logged_at_utc, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def insert_inference(self, record: Dict[str, Any]) -> None:
+        """
+        Stores one inference record, indexed by its timestamp and originating signal_id.
+        """
+        self.insert_inferences([record])
+
+    def insert_inferences(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Stores several inference records in a single transaction.
+        """
+        rows = []
+        for r in records:
+            timestamp = r.get("timestamp") or r.get("timestamp_utc")
+            signal_id = r.get("signal_id") or (r.get("signal_data") or {}).get("signal_id")
+            rows.append((
+                timestamp,
+                to_epoch_us(timestamp),
+                signal_id,
+                r.get("llm_model"),
+                json.dumps(r, ensure_ascii=False),
+            ))
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO inferences (timestamp, ts_epoch_us, signal_id, llm_model, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    # --- Reads
+
+    def _iter_payloads(self, sql: str, params: tuple) -> Iterator[Dict[str, Any]]:
+        cursor = self._connection().execute(sql, params)
+        for row in cursor:
+            yield json.loads(row["payload"])
+
+    def _range_clause(self, start: TimeBound, end: TimeBound) -> tuple:
+        clauses, params = [], []
+        start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+        if start_us is not None:
+            clauses.append("ts_epoch_us >= ?")
+            params.append(start_us)
+        if end_us is not None:
+            clauses.append("ts_epoch_us < ?")
+            params.append(end_us)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, tuple(params)
+
+    def iter_signals(self, start: TimeBound = None, end: TimeBound = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams signal packets with start <= timestamp < end, oldest first.
+        """
+        where, params = self._range_clause(start, end)
+        return self._iter_payloads(f"SELECT payload FROM signals{where} ORDER BY ts_epoch_us, id", params)
+
+    def iter_inferences(self, start: TimeBound = None, end: TimeBound = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams inference records with start <= timestamp < end, oldest first.
+        """
+        where, params = self._range_clause(start, end)
+        return self._iter_payloads(f"SELECT payload FROM inferences{where} ORDER BY ts_epoch_us, id", params)
+
+    def get_signal(self, signal_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a signal packet by its signal_id.
+        """
+        return next(self._iter_payloads(
+            "SELECT payload FROM signals WHERE signal_id = ? ORDER BY id DESC LIMIT 1", (signal_id,)
+        ), None)
+
+    def inferences_for_signal(self, signal_id: str) -> List[Dict[str, Any]]:
+        """
+        Returns every inference produced from the given signal_id, oldest first.
+        """
+        return list(self._iter_payloads(
+            "SELECT payload FROM inferences WHERE signal_id = ? ORDER BY id", (signal_id,)
+        ))
+
+    def latest_signals(self, n: int) -> List[Dict[str, Any]]:
+        """
+        Returns the newest n signal packets in chronological order.
+        """
+        rows = list(self._iter_payloads("SELECT payload FROM signals ORDER BY id DESC LIMIT ?", (int(n),)))
+        return rows[::-1]
+
+    def latest_inferences(self, n: int) -> List[Dict[str, Any]]:
+        """
+        Returns the newest n inference records in chronological order.
+        """
+        rows = list(self._iter_payloads("SELECT payload FROM inferences ORDER BY id DESC LIMIT ?", (int(n),)))
+        return rows[::-1]
+
+    def count(self, table: str) -> int:
+        """
+        Returns the number of rows in "signals" or "inferences".
+        """
+        if table not in ("signals", "inferences"):
+            raise ValueError(f"Unknown table: {table}")
+        return self._connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+_stores: Dict[str, SQLiteLogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path: str) -> SQLiteLogStore:
+    """
+    Returns the process-wide store for a database path, creating it on first use.
+    """
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = SQLiteLogStore(db_path)
+            _stores[key] = store
+        return store
@@ -0,0 +1,103 @@
+"""
+Tag Registry — Interns pattern tags to bit positions so a user's tags become one integer.
+Membership and combination tests ("reactive AND early-peak") are single bitwise operations,
+and tag masks of many users fit in a uint64 array for vectorized filtering.
+New tags are interned on first sight; positions are stable for the life of the process.
+"""
+
+import threading
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Tags referenced by the matcher rules and the simulated Gemma responses get the low bits
+KNOWN_TAGS = (
+    "introvert-aligned", "early-peak", "reactive", "volatile", "creative", "stimulus-seeking",
+)
+
+MASK_ARRAY_BITS = 64
+
+
+class TagRegistry:
+    def __init__(self, tags: Iterable[str] = ()):
+        self._bits: Dict[str, int] = {}
+        self._tags: List[str] = []
+        self._lock = threading.Lock()
+        for tag in tags:
+            self.bit(tag)
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self._bits
+
+    def bit(self, tag: str) -> int:
+        """
+        Returns the bit position of a tag, interning it if it is new.
+        """
+        position = self._bits.get(tag)
+        if position is None:
+            with self._lock:
+                position = self._bits.get(tag)
+                if position is None:
+                    position = len(self._tags)
+                    self._tags.append(tag)
+                    self._bits[tag] = position
+        return position
+
+    def mask(self, tags: Iterable[str]) -> int:
+        """
+        Returns the bitmask of a tag collection.
+        """
+        result = 0
+        for tag in tags:
+            result |= 1 << self.bit(tag)
+        return result
+
+    def tags(self, mask: int) -> List[str]:
+        """
+        Returns the tags set in a mask, in interning order.
+        """
+        return [tag for position, tag in enumerate(self._tags) if mask >> position & 1]
+
+    def mask_array(self, tag_lists: Iterable[Iterable[str]]) -> np.ndarray:
+        """
+        Returns the masks of many tag collections as a uint64 array (object array past 64 tags).
+        """
+        masks = [self.mask(tags) for tags in tag_lists]
+        dtype = np.uint64 if len(self._tags) <= MASK_ARRAY_BITS else object
+        return np.array(masks, dtype=dtype)
+
+
+def has_all(mask: int, required: int) -> bool:
+    return mask & required == required
+
+
+def has_any(mask: int, candidates: int) -> bool:
+    return bool(mask & candidates)
+
+
+def select(masks: np.ndarray, all_of: int = 0, any_of: int = 0, none_of: int = 0) -> np.ndarray:
+    """
+    Vectorized filter over a mask array, e.g. every user who is reactive AND early-peak:
+        select(masks, all_of=registry.mask(["reactive", "early-peak"]))
+    """
+    kind = masks.dtype if masks.dtype != object else None
+    all_of, any_of, none_of = (np.array(m, dtype=kind) if kind is not None else m for m in (all_of, any_of, none_of))
+    selected = (masks & all_of) == all_of
+    if any_of:
+        selected &= (masks & any_of) != 0
+    if none_of:
+        selected &= (masks & none_of) == 0
+    return np.asarray(selected, dtype=bool)
+
+
+_registry = TagRegistry(KNOWN_TAGS)
+
+
+def get_tag_registry() -> TagRegistry:
+    """
+    Returns the process-wide tag registry.
+    """
+    return _registry
@@ -5,9 +5,18 @@ Provides common functionality for data loading, saving, and directory management
 
 import json
 import os
-from typing import Any, List, Dict
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, List, Dict, Iterator
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 
 def load_json(filepath: str, default: Any = None) -> Any:
     """
@@ -20,6 +29,9 @@ def load_json(filepath: str, default: Any = None) -> Any:
     Returns:
         Any: Loaded JSON data or default value
     """
+    if is_jsonl_path(filepath):
+        return load_jsonl(filepath, default=default)
+
     try:
         if os.path.exists(filepath):
             with open(filepath, 'r', encoding='utf-8') as f:
@@ -34,29 +46,276 @@ def append_json_line(data: Dict[str, Any], filepath: str) -> None:
     """
     Append a new entry to a JSON array file.
     Creates the file if it doesn't exist.
+    Paths ending in ".jsonl" are appended to as a single line instead of
+    rewriting the whole array.
     
     Args:
         data (Dict[str, Any]): Data to append
         filepath (str): Path to the JSON file
     """
+    if is_jsonl_path(filepath):
+        append_jsonl(data, filepath)
+        return
+
     try:
-        # Load existing data
-        existing_data = load_json(filepath, default=[])
-        
+        update_json_array(filepath, [data], indent=2)
+    except Exception as e:
+        print(f"Error appending to JSON file {filepath}: {e}")
+
+
+@contextmanager
+def file_lock(filepath: str) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock for a data file, shared across threads and processes.
+    The lock lives in a "<filepath>.lock" sidecar so the data file itself can be replaced.
+    
+    Args:
+        filepath (str): Path of the file being protected
+    """
+    lock_path = f"{filepath}.lock"
+    ensure_dir(os.path.dirname(lock_path))
+    with open(lock_path, 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_text(content: str, filepath: str) -> None:
+    """
+    Replace a file's content atomically: write a temp file in the same
+    directory, fsync it, then rename it over the target. Readers see either
+    the old or the new content, never a truncated file.
+    
+    Args:
+        content (str): Full new file content
+        filepath (str): Path to the target file
+    """
+    directory = os.path.dirname(filepath)
+    ensure_dir(directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{os.path.basename(filepath)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def update_json_array(filepath: str, records: List[Dict[str, Any]], indent: int = 2) -> None:
+    """
+    Append records to a legacy JSON array file under the file lock, replacing it atomically.
+    An unreadable existing file is moved aside to "<filepath>.corrupt-<timestamp>"
+    instead of being silently overwritten with an empty history.
+    
+    Args:
+        records (List[Dict[str, Any]]): Records to append
+        filepath (str): Path to the JSON file
+        indent (int): Indentation for the rewritten file
+    """
+    with file_lock(filepath):
+        existing_data = []
+        if os.path.exists(filepath):
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    existing_data = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+                quarantine = f"{filepath}.corrupt-{stamp}"
+                os.replace(filepath, quarantine)
+                print(f"Unreadable JSON log {filepath} moved to {quarantine}")
+
         # Ensure it's a list
         if not isinstance(existing_data, list):
             existing_data = []
+
+        existing_data.extend(records)
+        atomic_write_text(json.dumps(existing_data, indent=indent, ensure_ascii=False), filepath)
+
+
+def is_jsonl_path(filepath: str) -> bool:
+    """
+    Check whether a path points to a line-delimited JSON log.
+    
+    Args:
+        filepath (str): Path to check
         
-        # Append new data
-        existing_data.append(data)
-        
-        # Save back to file
+    Returns:
+        bool: True if the path uses the ".jsonl" extension
+    """
+    return str(filepath).endswith(".jsonl")
+
+
+def append_jsonl(data: Dict[str, Any], filepath: str) -> None:
+    """
+    Append one record to a JSON Lines log with a single write.
+    Creates the file if it doesn't exist.
+    
+    Args:
+        data (Dict[str, Any]): Record to append
+        filepath (str): Path to the JSONL file
+    """
+    try:
+        line = json.dumps(data, ensure_ascii=False) + "\n"
         ensure_dir(os.path.dirname(filepath))
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
-            
+        with file_lock(filepath), open(filepath, 'a', encoding='utf-8') as f:
+            f.write(line)
     except Exception as e:
-        print(f"Error appending to JSON file {filepath}: {e}")
+        print(f"Error appending to JSONL file {filepath}: {e}")
+
+
+def append_jsonl_many(records: List[Dict[str, Any]], filepath: str, fsync: bool = False) -> None:
+    """
+    Append several records to a JSON Lines log with a single write.
+    
+    Args:
+        records (List[Dict[str, Any]]): Records to append, in order
+        filepath (str): Path to the JSONL file
+        fsync (bool): Force the data to disk before returning
+    """
+    if not records:
+        return
+    payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    ensure_dir(os.path.dirname(filepath))
+    with file_lock(filepath), open(filepath, 'a', encoding='utf-8') as f:
+        f.write(payload)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def iter_jsonl(filepath: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a JSON Lines log one at a time.
+    Blank lines and lines that fail to parse (e.g. a torn final write) are skipped.
+    
+    Args:
+        filepath (str): Path to the JSONL file
+        
+    Yields:
+        Dict[str, Any]: Parsed records in file order
+    """
+    if not os.path.exists(filepath):
+        return
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def iter_jsonl_reverse(filepath: str, block_size: int = 8192) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a JSON Lines log newest-first by reading fixed-size
+    blocks backwards from the end of the file. Only the tail that is actually
+    consumed is read from disk.
+    
+    Args:
+        filepath (str): Path to the JSONL file
+        block_size (int): Number of bytes read per backwards seek
+        
+    Yields:
+        Dict[str, Any]: Parsed records, newest first
+    """
+    if not os.path.exists(filepath):
+        return
+    with open(filepath, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size) + remainder
+            lines = chunk.split(b"\n")
+            # The first piece may be the tail of a line that starts in an earlier block
+            remainder = lines.pop(0) if position > 0 else b""
+            for line in reversed(lines):
+                record = _parse_jsonl_line(line)
+                if record is not None:
+                    yield record
+        record = _parse_jsonl_line(remainder)
+        if record is not None:
+            yield record
+
+
+def _parse_jsonl_line(line: bytes) -> Any:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def read_last(filepath: str, n: int) -> List[Dict[str, Any]]:
+    """
+    Return the newest n records of a log in chronological order.
+    JSON Lines logs are read from the end, so cost depends on n rather than
+    file size; legacy JSON array logs fall back to a full load.
+    
+    Args:
+        filepath (str): Path to the log file
+        n (int): Number of records to return
+        
+    Returns:
+        List[Dict[str, Any]]: Up to n records, oldest first
+    """
+    if n <= 0:
+        return []
+    if not is_jsonl_path(filepath):
+        data = load_json(filepath, default=[])
+        return data[-n:] if isinstance(data, list) else []
+
+    records = []
+    try:
+        for record in iter_jsonl_reverse(filepath):
+            records.append(record)
+            if len(records) >= n:
+                break
+    except IOError:
+        return []
+    return records[::-1]
+
+
+def load_jsonl(filepath: str, default: Any = None) -> List[Dict[str, Any]]:
+    """
+    Load a JSON Lines log into a list, matching the shape load_json returns
+    for legacy JSON array logs.
+    
+    Args:
+        filepath (str): Path to the JSONL file
+        default (Any): Value to return if the file doesn't exist or can't be read
+        
+    Returns:
+        List[Dict[str, Any]]: Records in file order, or the default value
+    """
+    fallback = default if default is not None else []
+    if not os.path.exists(filepath):
+        return fallback
+    try:
+        return list(iter_jsonl(filepath))
+    except (IOError, UnicodeDecodeError):
+        return fallback
 
 
 def ensure_dir(directory: str) -> None:
@@ -79,9 +338,8 @@ def save_json(data: Any, filepath: str) -> None:
         filepath (str): Path to the JSON file
     """
     try:
-        ensure_dir(os.path.dirname(filepath))
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with file_lock(filepath):
+            atomic_write_text(json.dumps(data, indent=2, ensure_ascii=False), filepath)
     except Exception as e:
         print(f"Error saving JSON file {filepath}: {e}")
 
@@ -112,8 +370,7 @@ def write_text_file(content: str, filepath: str) -> None:
         filepath (str): Path to the text file
     """
     try:
-        ensure_dir(os.path.dirname(filepath))
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        with file_lock(filepath):
+            atomic_write_text(content, filepath)
     except Exception as e:
         print(f"Error writing text file {filepath}: {e}")
@@ -1,8 +1,11 @@
 import json
-import os
 from datetime import datetime, timezone
 import uuid
 
+from app.utils import atomic_write_text, file_lock
+from app.log_writer import SIGNAL_TABLE, submit_record
+from app.signal_record import SignalRecord
+
 def save_signal_data(signal_packet: dict, filepath: str, include_metadata: bool = True):
     """
     Saves a single signal packet to a JSON file, optionally wrapped with metadata.
@@ -16,29 +19,24 @@ def save_signal_data(signal_packet: dict, filepath: str, include_metadata: bool
             "saved_at_utc": datetime.now(timezone.utc).isoformat()
         }
 
-    with open(filepath, "w", encoding='utf-8') as f:
-        json.dump(envelope, f, indent=4, ensure_ascii=False)
+    with file_lock(filepath):
+        atomic_write_text(json.dumps(envelope, indent=4, ensure_ascii=False), filepath)
 
 def append_signal_log(signal_entry: dict, filepath: str):
     """
     Appends signal entry to a historical JSON log file.
     Ensures robustness and traceability over time.
+    ".jsonl" logs are appended in place, ".db" paths go to the SQLite store,
+    and legacy ".json" arrays are rewritten. The write is handed to the
+    background log writer unless LOG_WRITER_BACKGROUND is disabled.
+    A SignalRecord is logged in its dict form.
     """
+    if isinstance(signal_entry, SignalRecord):
+        signal_entry = signal_entry.to_dict()
     signal_entry["record_id"] = str(uuid.uuid4())
     signal_entry["logged_at_utc"] = datetime.now(timezone.utc).isoformat()
 
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, "r", encoding='utf-8') as f:
-                log_data = json.load(f)
-        except json.JSONDecodeError:
-            log_data = []
-    else:
-        log_data = []
-
-    log_data.append(signal_entry)
-    with open(filepath, "w", encoding='utf-8') as f:
-        json.dump(log_data, f, indent=4, ensure_ascii=False)
+    submit_record(signal_entry, filepath, SIGNAL_TABLE)
 
 def format_for_ollama_prompt(signal_entry: dict) -> str:
     """
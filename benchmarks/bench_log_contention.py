@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Log Contention Benchmark
+Spawns several processes that append to the same log at once, then checks that
+no record was lost and reports throughput and per-append latency.
+
+Usage:
+    python benchmarks/bench_log_contention.py --processes 8 --appends 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils import append_json_line, load_json
+
+
+def _worker(args):
+    filepath, worker_id, appends = args
+    latencies = []
+    for i in range(appends):
+        record = {"worker": worker_id, "seq": i, "skin_conductance": 3.21, "environmental_state": "neutral"}
+        started = time.perf_counter()
+        append_json_line(record, filepath)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_case(label: str, filepath: str, processes: int, appends: int) -> bool:
+    jobs = [(filepath, worker_id, appends) for worker_id in range(processes)]
+    started = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_worker, jobs)
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for worker in results for latency in worker]
+    records = load_json(filepath, default=[])
+    expected = processes * appends
+    seen = {(r.get("worker"), r.get("seq")) for r in records}
+    intact = len(records) == expected and len(seen) == expected
+
+    print(f"{label}")
+    print(f"  records: {len(records)}/{expected} ({'intact' if intact else 'LOST OR DUPLICATED'})")
+    print(f"  throughput: {expected / elapsed:,.0f} appends/s over {elapsed:.2f}s")
+    print(f"  latency p50: {_percentile(latencies, 50) * 1000:.2f} ms, "
+          f"p99: {_percentile(latencies, 99) * 1000:.2f} ms")
+    return intact
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent append benchmark for Gemma Guard logs.")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--appends", type=int, default=200, help="Appends per process")
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as workdir:
+        ok &= run_case("JSONL log (locked single-line append)",
+                       os.path.join(workdir, "bench_log.jsonl"), args.processes, args.appends)
+        ok &= run_case("Legacy JSON array (locked read-modify-write, atomic replace)",
+                       os.path.join(workdir, "bench_log.json"), args.processes, args.appends)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
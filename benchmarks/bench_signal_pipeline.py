@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Signal Pipeline Replay Benchmark
+Generates a seeded workload of signals, runs match → prompt → simulated response → insight
+on each one, and reports throughput and per-signal latency. The workload fingerprint is a
+hash of every generated packet: runs with the same seed and count must print the same value,
+so their timings are directly comparable.
+
+Usage:
+    python benchmarks/bench_signal_pipeline.py --seed 42 --signals 20000
+    SIGNAL_SEED=42 python benchmarks/bench_signal_pipeline.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.chdir(project_root)
+
+from app.signal_engine import get_current_signal, seed_signals
+from app.matcher import match_signal_to_profile
+from app.gemma_inference import load_prompt_template, render_prompt, simulate_gemma_response
+from app.insight_generator import generate_insight
+
+PATTERN_TAGS = ["introvert-aligned", "early-peak", "reactive", "creative"]
+WORKLOAD_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def build_workload(seed, count):
+    rng = seed_signals(seed)
+    return [get_current_signal(rng, timestamp=WORKLOAD_START + timedelta(seconds=i)) for i in range(count)]
+
+
+def fingerprint(signals):
+    digest = hashlib.sha256()
+    for signal in signals:
+        digest.update(json.dumps(signal, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(signals):
+    template = load_prompt_template()
+    latencies = []
+    started = time.perf_counter()
+    for signal in signals:
+        t0 = time.perf_counter()
+        match_result = match_signal_to_profile(signal, PATTERN_TAGS)
+        prompt = render_prompt(template, PATTERN_TAGS, signal)
+        generate_insight(match_result, simulate_gemma_response(prompt, PATTERN_TAGS))
+        latencies.append(time.perf_counter() - t0)
+    return time.perf_counter() - started, latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Seeded replay benchmark for the Gemma Guard signal pipeline.")
+    parser.add_argument("--seed", type=int, default=None, help="Workload seed (defaults to SIGNAL_SEED, then 0)")
+    parser.add_argument("--signals", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the same workload")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else int(os.getenv("SIGNAL_SEED", "0"))
+    signals = build_workload(seed, args.signals)
+    print(f"Workload: seed={seed}, signals={len(signals)}, fingerprint={fingerprint(signals)}")
+
+    for attempt in range(1, args.repeat + 1):
+        elapsed, latencies = run(signals)
+        print(f"  pass {attempt}: {len(signals) / elapsed:,.0f} signals/s, "
+              f"p50 {_percentile(latencies, 50) * 1e6:.1f} µs, p99 {_percentile(latencies, 99) * 1e6:.1f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
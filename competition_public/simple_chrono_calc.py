@@ -5,7 +5,17 @@ For competition transparency while protecting proprietary algorithms.
 """
 
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+def seasonal_risk_months(current_month: Optional[int] = None) -> Tuple[List[int], List[int]]:
+    """
+    High-risk and recovery months counted from the current month (the only part of the
+    profile that depends on today's date rather than the birth date).
+    """
+    current_month = current_month or datetime.now().month
+    high_risk_months = [(current_month + i) % 12 + 1 for i in [2, 6]]
+    recovery_months = [(current_month + i) % 12 + 1 for i in [4, 8]]
+    return high_risk_months, recovery_months
 
 def simple_chronotype_calculation(birth_date: str) -> Dict[str, Any]:
     """
@@ -40,9 +50,7 @@ def simple_chronotype_calculation(birth_date: str) -> Dict[str, Any]:
     element_index = (month + day) % len(elements)
     
     # Calculate risk periods (simplified)
-    current_month = datetime.now().month
-    high_risk_months = [(current_month + i) % 12 + 1 for i in [2, 6]]
-    recovery_months = [(current_month + i) % 12 + 1 for i in [4, 8]]
+    high_risk_months, recovery_months = seasonal_risk_months()
     
     return {
         "chrono_signature": f"Simple-{cognitive_styles[cognitive_index][:4]}-{month:02d}",
@@ -0,0 +1,34 @@
+"""
+Shared test setup: puts the repo root on sys.path and, when the proprietary `private`
+package is not installed, registers placeholders for the names app/ imports from it so
+the package can be imported. Tests never call into those placeholders.
+"""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def _unavailable(*args, **kwargs):
+    raise RuntimeError("the private engine is not installed")
+
+
+if importlib.util.find_spec("private") is None:
+    private = types.ModuleType("private")
+    private.__path__ = []
+    for name, functions in {
+        "core_logic_real": ("get_chrono_signature_profile",),
+        "chrono_decoder": ("get_chrono_profile_without_biometrics",),
+        "llm_inference": ("generate_narrative", "check_ollama_health"),
+    }.items():
+        module = types.ModuleType(f"private.{name}")
+        for function in functions:
+            setattr(module, function, _unavailable)
+        setattr(private, name, module)
+        sys.modules[module.__name__] = module
+    sys.modules["private"] = private
@@ -0,0 +1,96 @@
+"""
+Rotation + retention round trips for JSONL logs and the sidecars derived from them.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.log_rotation import RotationPolicy, iter_log_range, load_manifest, read_last_records, rotate_log
+from app.log_writer import write_records
+from app.signal_index import SignalIndex
+from app.signal_rollup import read_rollups
+
+
+@pytest.fixture
+def start():
+    # Recent enough that rollup tier retention never applies
+    return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=6)
+
+
+def _signals(start, hour, n=3):
+    return [{
+        "signal_id": f"sig-{hour}-{i}",
+        "timestamp_utc": (start + timedelta(hours=hour, minutes=i)).isoformat(),
+        "skin_conductance": 2.0 + i,
+        "environmental_state": "neutral",
+    } for i in range(n)]
+
+
+def _write_hours(log_path, start, hours, policy):
+    for hour in range(hours):
+        write_records(_signals(start, hour), log_path, "signals")
+        rotate_log(log_path, policy)
+
+
+def _keep_last_segment(log_path):
+    # Segments of equal-sized hours compress to about the same size: room for one, not two
+    largest = max(entry["bytes"] for entry in load_manifest(log_path))
+    return RotationPolicy(max_bytes=1, retention_max_bytes=int(largest * 1.5))
+
+
+def _write_with_retention(log_path, start):
+    _write_hours(log_path, start, 3, RotationPolicy(max_bytes=1, retention_max_bytes=0))
+    write_records(_signals(start, 3), log_path, "signals")
+    rotate_log(log_path, _keep_last_segment(log_path))
+
+
+def test_rotated_log_reads_back_in_order(tmp_path, start):
+    log_path = str(tmp_path / "signal_log.jsonl")
+    _write_hours(log_path, start, 4, RotationPolicy(max_bytes=1, retention_max_bytes=0))
+    write_records(_signals(start, 4), log_path, "signals")
+
+    expected = [s for hour in range(5) for s in _signals(start, hour)]
+    assert list(iter_log_range(log_path)) == expected
+    assert read_last_records(log_path, 5) == expected[-5:]
+    assert read_last_records(log_path, 100) == expected
+
+    window = list(iter_log_range(log_path, start + timedelta(hours=1), start + timedelta(hours=2)))
+    assert window == _signals(start, 1)
+
+
+def test_segment_sequences_never_restart_after_retention(tmp_path, start):
+    log_path = str(tmp_path / "signal_log.jsonl")
+    _write_with_retention(log_path, start)
+    assert [entry["sequence"] for entry in load_manifest(log_path)] == [4]
+
+    write_records(_signals(start, 4), log_path, "signals")
+    rotate_log(log_path, _keep_last_segment(log_path))
+    assert [entry["sequence"] for entry in load_manifest(log_path)] == [5]
+
+
+def test_retention_prunes_index_and_minute_rollups_but_keeps_hours(tmp_path, start):
+    log_path = str(tmp_path / "signal_log.jsonl")
+    _write_with_retention(log_path, start)
+    retained = list(iter_log_range(log_path))
+    assert retained == _signals(start, 3)
+
+    assert len(SignalIndex(log_path).records) == len(retained)
+    # Only the bucket holding the newest deleted record may remain from before the cutoff
+    last_dropped = (start + timedelta(hours=2, minutes=2)).timestamp()
+    minutes = read_rollups(log_path, "minute")
+    assert len(minutes) == 4
+    assert all(bucket["bucket_start"] + 60 > last_dropped for bucket in minutes)
+    hours = read_rollups(log_path, "hour")
+    assert [bucket["count"] for bucket in hours] == [3, 3, 3, 3]
+    assert all(bucket["mean"] == pytest.approx(3.0) for bucket in hours)
+
+
+def test_read_last_records_falls_back_for_legacy_json_arrays(tmp_path):
+    log_path = tmp_path / "inference_log.json"
+    records = [{"timestamp": f"t{i}", "pattern_tags": ["introvert-aligned"], "summary": str(i)} for i in range(4)]
+    log_path.write_text(json.dumps(records, indent=2), encoding="utf-8")
+
+    assert read_last_records(str(log_path), 2) == records[-2:]
+    assert read_last_records(str(tmp_path / "missing.json"), 2) == []
@@ -0,0 +1,56 @@
+"""
+match_batch() must agree with match_signal_to_profile() signal by signal.
+"""
+
+import numpy as np
+import pytest
+
+from app.matcher import match_batch, match_signal_to_profile
+from app.signal_engine import generate_signal_batch, signal_batch_to_packets
+
+PROFILES = {
+    "introvert": ["introvert-aligned"],
+    "morning": ["early-peak", "creative"],
+    "reactive": ["reactive", "introvert-aligned"],
+    "all": ["reactive", "creative", "early-peak", "introvert-aligned"],
+    "none": [],
+}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_batch_agrees_with_scalar_matcher(seed):
+    batch = generate_signal_batch(200, start="2025-01-01T00:00:00+00:00", rng=np.random.default_rng(seed))
+    packets = signal_batch_to_packets(batch)
+    result = match_batch(batch, PROFILES)
+
+    assert result["profile_ids"] == list(PROFILES)
+    for p, tags in enumerate(PROFILES.values()):
+        for s, packet in enumerate(packets):
+            scalar = match_signal_to_profile(packet, tags)
+            batched = [label for label, hit in zip(result["labels"], result["mismatches"][p, s]) if hit]
+            assert batched == scalar["mismatches"]
+            assert result["misaligned"][p, s] == (scalar["status"] == "misaligned")
+    np.testing.assert_array_equal(result["counts"], result["mismatches"].sum(axis=1))
+
+
+def test_match_batch_accepts_column_dicts_with_optional_channels():
+    columns = {
+        "skin_conductance": np.array([5.0, 1.0, np.nan]),
+        "heart_rate": np.array([120.0, 70.0, 115.0]),
+        "hrv_rmssd": np.array([15.0, 40.0, np.nan]),
+        "environmental_state": np.array(["restrictive", "neutral", "charged"]),
+    }
+    packets = [{key: values[i].item() for key, values in columns.items()
+                if not (isinstance(values[i], float) and np.isnan(values[i]))} for i in range(3)]
+    tags = PROFILES["all"]
+    result = match_batch(columns, [tags])
+
+    for s, packet in enumerate(packets):
+        batched = [label for label, hit in zip(result["labels"], result["mismatches"][0, s]) if hit]
+        assert batched == match_signal_to_profile(packet, tags)["mismatches"]
+
+
+def test_defaults_apply_only_when_requested():
+    hr_only = {"heart_rate": 80.0, "environmental_state": "neutral"}
+    assert match_signal_to_profile(hr_only, ["early-peak"])["mismatches"] == ["underactive_morning"]
+    assert match_signal_to_profile(hr_only, ["early-peak"], use_defaults=False)["status"] == "aligned"
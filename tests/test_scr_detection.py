@@ -0,0 +1,48 @@
+"""
+Chunked SCRDetector output must equal whole-window detect_scr_peaks output.
+"""
+
+import numpy as np
+import pytest
+
+from app.scr_detection import SCRDetector, detect_scr_peaks
+
+
+def _detect_chunked(timestamps_ns, eda, chunk_sizes, **kwargs):
+    detector = SCRDetector(**kwargs)
+    peaks, i, k = [], 0, 0
+    while i < len(eda):
+        size = chunk_sizes[k % len(chunk_sizes)]
+        peaks.append(detector.process(timestamps_ns[i:i + size], eda[i:i + size]))
+        i, k = i + size, k + 1
+    return np.concatenate(peaks)
+
+
+def _assert_same_peaks(chunked, whole):
+    assert len(chunked) == len(whole)
+    np.testing.assert_array_equal(chunked["onset_ns"], whole["onset_ns"])
+    np.testing.assert_array_equal(chunked["peak_ns"], whole["peak_ns"])
+    np.testing.assert_allclose(chunked["amplitude"], whole["amplitude"], atol=1e-6)
+
+
+def test_rise_longer_than_max_rise_is_not_restarted_mid_chunk():
+    # 4 Hz, 8 s, 1 µS ramp: too slow to be an SCR with max_rise_s=5
+    timestamps = np.arange(32, dtype=np.int64) * 250_000_000
+    eda = np.linspace(1.0, 2.0, 32)
+    whole = detect_scr_peaks(timestamps, eda)
+    assert len(whole) == 0
+    _assert_same_peaks(_detect_chunked(timestamps, eda, [12]), whole)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunked_detection_matches_whole_window(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(50, 1500))
+    rate_hz = float(rng.choice([1.0, 4.0, 8.0]))
+    timestamps = (np.arange(n) * 1e9 / rate_hz).astype(np.int64)
+    eda = np.round(2.0 + np.cumsum(rng.normal(0.005, 0.03, n)), 2)
+    kwargs = {"max_rise_s": float(rng.choice([1.0, 3.0, 5.0])), "smooth_samples": int(rng.choice([1, 2, 4]))}
+
+    whole = detect_scr_peaks(timestamps, eda, **kwargs)
+    chunk_sizes = [int(size) for size in rng.integers(1, 40, 16)]
+    _assert_same_peaks(_detect_chunked(timestamps, eda, chunk_sizes, **kwargs), whole)
@@ -0,0 +1,94 @@
+"""
+Recorded-file ingest: layouts, chunking, dropouts and matching of partial channel sets.
+"""
+
+import numpy as np
+import pytest
+
+from app.log_writer import flush_logs
+from app.signal_ingest import detect_layout, ingest_recording, iter_recording
+from app.utils import load_jsonl
+
+START_S = 1_700_000_040  # On a minute boundary, so 60 s windows are full
+
+
+def _write_wearable(path, rate_hz, values):
+    path.write_text(f"{START_S}\n{rate_hz}\n" + "".join(f"{v}\n" for v in values), encoding="utf-8")
+    return str(path)
+
+
+def _read_log(path):
+    # Packets may still be queued on the background log writer
+    flush_logs()
+    return load_jsonl(path)
+
+
+def test_layouts_are_detected(tmp_path):
+    wearable = _write_wearable(tmp_path / "EDA.csv", 4, ["1.0"] * 8)
+    table = tmp_path / "table.csv"
+    table.write_text("timestamp,eda\n1700000040,1.0\n", encoding="utf-8")
+    assert detect_layout(wearable) == "wearable"
+    assert detect_layout(str(table)) == "table"
+
+
+@pytest.mark.parametrize("chunk_size", [7, 100, 65_536])
+def test_chunking_does_not_change_packets(tmp_path, chunk_size):
+    values = [f"{2.0 + np.sin(i / 40):.3f}" for i in range(1200)]
+    path = _write_wearable(tmp_path / "EDA.csv", 4, values)
+
+    reference_log = str(tmp_path / "reference.jsonl")
+    ingest_recording(path, ["early-peak"], signal_log_path=reference_log, chunk_size=len(values))
+    chunked_log = str(tmp_path / f"chunked_{chunk_size}.jsonl")
+    summary = ingest_recording(path, ["early-peak"], signal_log_path=chunked_log, chunk_size=chunk_size)
+
+    assert summary["samples"] == len(values)
+    # record_id and logged_at_utc are stamped per write
+    strip = lambda packets: [{k: v for k, v in p.items() if k not in ("record_id", "logged_at_utc")} for p in packets]
+    reference = strip(_read_log(reference_log))
+    assert strip(_read_log(chunked_log)) == reference
+    assert len(reference) == 5
+
+
+def test_chunks_stay_within_the_size_bound(tmp_path):
+    path = _write_wearable(tmp_path / "EDA.csv", 4, ["1.5"] * 1000)
+    sizes = [len(chunk["timestamp_ns"]) for chunk in iter_recording(path, chunk_size=64)]
+    assert max(sizes) <= 64 and sum(sizes) == 1000
+
+
+def test_empty_cells_are_reported_as_gaps(tmp_path):
+    values = ["1.0"] * 2400
+    values[800:1000] = [""] * 200
+    path = _write_wearable(tmp_path / "EDA.csv", 4, values)
+    summary = ingest_recording(path, [], chunk_size=500)
+
+    assert summary["gaps"] == 1
+    assert summary["gap_s"] == pytest.approx(50.25)
+    assert summary["packets"] + summary["low_quality"] == 10
+
+
+def test_hr_only_export_does_not_trigger_eda_rules(tmp_path):
+    path = _write_wearable(tmp_path / "HR.csv", 1, ["80"] * 600)
+    log_path = str(tmp_path / "signal_log.jsonl")
+    summary = ingest_recording(path, ["early-peak", "introvert-aligned"], signal_log_path=log_path,
+                               channel="heart_rate")
+
+    assert summary["packets"] == 10
+    assert summary["mismatch_counts"] == {}
+    packets = _read_log(log_path)
+    assert all("skin_conductance" not in p and p["heart_rate"] == 80.0 for p in packets)
+
+
+def test_jittery_table_is_resampled_per_window(tmp_path):
+    rng = np.random.default_rng(0)
+    timestamps = START_S + np.arange(480) * 0.25 + rng.normal(0, 0.03, 480)
+    rows = "".join(f"{t:.3f},2.5,{70 + i % 5},restrictive\n" for i, t in enumerate(timestamps))
+    path = tmp_path / "session.csv"
+    path.write_text("timestamp,eda,hr,state\n" + rows, encoding="utf-8")
+    log_path = str(tmp_path / "signal_log.jsonl")
+    summary = ingest_recording(str(path), ["reactive"], signal_log_path=log_path, window_s=30)
+
+    packets = _read_log(log_path)
+    assert summary["mismatch_counts"] == {"emotional_constraint": summary["packets"]}
+    assert all(p["environmental_state"] == "restrictive" for p in packets)
+    assert all(p["skin_conductance"] == 2.5 and 70 <= p["heart_rate"] <= 74 for p in packets)
+    assert all(p["data_quality"] > 0.9 for p in packets[1:-1])
@@ -0,0 +1,69 @@
+"""
+SignalRecord must convert to and from the packet dict shape without loss.
+"""
+
+import json
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.signal_engine import generate_signal_batch, get_current_signal, signal_batch_to_packets
+from app.signal_record import EnvironmentalState, SignalRecord, as_signal_dict
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def _logged_packets():
+    packets = []
+    for entry in json.loads((DATA_DIR / "inference_log.json").read_text(encoding="utf-8")):
+        packets.append(entry.get("signal_packet", entry))
+    packets.extend(json.loads((DATA_DIR / "signal_log.json").read_text(encoding="utf-8")))
+    return [p for p in packets if isinstance(p, dict) and "timestamp_utc" in p and "environmental_state" in p]
+
+
+def test_bundled_log_packets_round_trip():
+    packets = _logged_packets()
+    assert packets
+    for packet in packets:
+        assert SignalRecord.from_dict(packet).to_dict() == packet
+
+
+@pytest.mark.parametrize("packet", [
+    {"signal_id": "sig-20250804-0032", "timestamp_utc": "2025-08-04T09:30:00Z",
+     "skin_conductance": 3.1, "environmental_state": "charged"},
+    {"signal_id": "A8FBBBF7-E985-440C-941C-8EB1A47A5FF9", "timestamp_utc": "2025-08-04T09:30:00",
+     "skin_conductance": 1.2, "environmental_state": "neutral", "heart_rate": 71.5},
+    {"signal_id": None, "timestamp_utc": "2025-08-04T09:30:00.123456+02:00",
+     "skin_conductance": None, "environmental_state": "restrictive"},
+])
+def test_non_canonical_ids_and_timestamps_are_kept(packet):
+    record = SignalRecord.from_dict(packet)
+    assert record.to_dict() == packet
+    assert record["signal_id"] == packet["signal_id"]
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_uuid_ids_are_packed():
+    packet = get_current_signal()
+    record = SignalRecord.from_dict(packet)
+    assert isinstance(record.signal_id, int)
+    assert record.timestamp_text is None
+    assert record.to_dict() == packet
+    assert as_signal_dict(record) == packet
+
+
+def test_batch_rows_match_their_packets():
+    batch = generate_signal_batch(20, start="2025-01-01T00:00:00+00:00", rng=np.random.default_rng(1))
+    for row, packet in zip(batch, signal_batch_to_packets(batch)):
+        assert SignalRecord.from_batch_row(row) == SignalRecord.from_dict(packet)
+
+
+def test_records_are_immutable_and_reject_unknown_states():
+    record = SignalRecord.from_dict(get_current_signal())
+    with pytest.raises(AttributeError):
+        record.skin_conductance = 0.0
+    assert record.environmental_state in EnvironmentalState
+    with pytest.raises(ValueError):
+        SignalRecord.from_dict({"timestamp_utc": "2025-01-01T00:00:00", "environmental_state": "calm"})